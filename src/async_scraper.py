@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:  # Optional async HTTP client: pip install aiohttp (or the "async" extra).
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on the environment
+    aiohttp = None
+
+import wiki_http
+from scraper import (
+    DEFAULT_PARSER,
+    USER_AGENT,
+    Quest,
+    QuestCsvWriter,
+    ScrapeResult,
+    article_html,
+    build_arg_parser,
+    content_digest,
+    load_state,
+    parse_quest,
+    rebase_url,
+    report_changes,
+    save_state,
+    state_path,
+)
+
+DEFAULT_RATE = 5.0  # requests per second to the wiki
+DEFAULT_BURST = 10
+DEFAULT_CONCURRENCY = 8
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `burst` requests at once, refilled at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def fetch_html_async(session, url: str, cache: Optional[wiki_http.ResponseCache]) -> str:
+    """
+    aiohttp counterpart of wiki_http.fetch_html: same conditional-GET cache, retry statuses and backoff.
+    """
+    settings = wiki_http.current_settings()
+    cached = cache.load(url) if cache else None
+    headers = {}
+    if cached:
+        _, meta = cached
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    for attempt in range(settings.retries + 1):
+        delay = settings.backoff * (2**attempt)
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if cached and resp.status == 304:
+                    cache.count(revalidated=True)
+                    return cached[0]
+                if resp.status in wiki_http.RETRY_STATUSES and attempt < settings.retries:
+                    retry_after = resp.headers.get("Retry-After", "")
+                    await asyncio.sleep(float(retry_after) if retry_after.isdigit() else delay)
+                    continue
+                resp.raise_for_status()
+                body = await resp.text()
+                if cache:
+                    cache.count(revalidated=False)
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+                    if etag or last_modified:
+                        cache.store(url, body, etag, last_modified)
+                return body
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= settings.retries:
+                raise
+            await asyncio.sleep(delay)
+    raise RuntimeError(f"Giving up on {url}")  # unreachable: the last attempt returns or raises
+
+
+async def scrape_quests_async(
+    quest_links: List[dict],
+    writer: QuestCsvWriter,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    bucket: Optional[TokenBucket] = None,
+    executor: Optional[Executor] = None,
+    parse_workers: int = 1,
+    base_url: Optional[str] = None,
+    previous: Optional[Dict[str, dict]] = None,
+    parser: str = DEFAULT_PARSER,
+    full_page: bool = False,
+) -> List[ScrapeResult]:
+    """
+    Three-stage pipeline: `concurrency` fetch workers (paced by `bucket`) feed parse jobs to `executor`,
+    and finished rows are streamed to `writer` in input order as soon as their predecessors are done.
+    """
+    if aiohttp is None:
+        raise RuntimeError("The async engine needs the aiohttp package (pip install aiohttp)")
+    loop = asyncio.get_running_loop()
+    total = len(quest_links)
+    bucket = bucket or TokenBucket()
+    previous = previous or {}
+    cache = wiki_http.current_cache()
+    settings = wiki_http.current_settings()
+    parse_workers = max(1, parse_workers)
+
+    jobs: asyncio.Queue = asyncio.Queue()
+    for job in enumerate(quest_links):
+        jobs.put_nowait(job)
+    parse_queue: asyncio.Queue = asyncio.Queue(maxsize=parse_workers * 2)
+    done_queue: asyncio.Queue = asyncio.Queue()
+    results: List[ScrapeResult] = []
+
+    async def fetch_worker(session) -> None:
+        while not jobs.empty():
+            idx, q = jobs.get_nowait()
+            await bucket.acquire()
+            print(f"[{idx + 1}/{total}] Scraping {q['title']}...")
+            url = rebase_url(q["href"], base_url)
+            article = article_html(await fetch_html_async(session, url, cache), full_page)
+            digest = content_digest(article)
+            known = previous.get(q["href"])
+            if known and known.get("sha1") == digest:
+                await done_queue.put((idx, ScrapeResult(q["href"], Quest(**known["quest"]), digest, "unchanged")))
+            else:
+                await parse_queue.put((idx, q["href"], article, digest, "changed" if known else "added"))
+
+    async def fetch_stage() -> None:
+        timeout = aiohttp.ClientTimeout(sock_connect=settings.connect_timeout, sock_read=settings.read_timeout)
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=settings.pool_maxsize)
+        headers = {"User-Agent": USER_AGENT}
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            async with asyncio.TaskGroup() as group:
+                for _ in range(concurrency):
+                    group.create_task(fetch_worker(session))
+        for _ in range(parse_workers):
+            await parse_queue.put(None)
+
+    async def parse_worker() -> None:
+        while (item := await parse_queue.get()) is not None:
+            idx, href, article, digest, status = item
+            quest = await loop.run_in_executor(executor, parse_quest, article, href, parser, True)
+            await done_queue.put((idx, ScrapeResult(href, quest, digest, status)))
+
+    async def write_stage() -> None:
+        pending: Dict[int, ScrapeResult] = {}
+        for _ in range(total):
+            idx, result = await done_queue.get()
+            pending[idx] = result
+            while len(results) in pending:
+                result = pending.pop(len(results))
+                writer.write(result)
+                results.append(result)
+
+    async with asyncio.TaskGroup() as group:
+        group.create_task(fetch_stage())
+        for _ in range(parse_workers):
+            group.create_task(parse_worker())
+        group.create_task(write_stage())
+    return results
+
+
+def main() -> None:
+    parser = build_arg_parser()
+    parser.description = "Scrape quest details asynchronously (aiohttp fetches, parsing in worker processes)."
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Pages fetched at once")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Max requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="Requests allowed at once before --rate applies")
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes parsing pages (0 = parse on a thread instead)",
+    )
+    args = parser.parse_args()
+    if args.source != "html":
+        parser.error("the async engine only scrapes rendered pages; use scraper.py for --source api")
+
+    wiki_http.configure(pool_maxsize=max(1, args.per_host), read_timeout=args.timeout, retries=args.retries)
+    cache = wiki_http.set_cache_dir(None if args.no_cache else args.cache_dir)
+
+    quest_links = json.loads(Path(args.links).read_text(encoding="utf-8"))
+    all_hrefs = {q["href"] for q in quest_links}
+    if args.limit:
+        quest_links = quest_links[: args.limit]
+
+    hashes_path = state_path(args.out)
+    stored = load_state(hashes_path)
+    previous = stored if args.incremental else {}
+    executor = ProcessPoolExecutor(args.parse_workers) if args.parse_workers > 0 else ThreadPoolExecutor(1)
+    with executor, QuestCsvWriter(args.out, resume=args.resume) as writer:
+        done = writer.done_hrefs()
+        if done:
+            print(f"Resuming: {len(done)} quests already in {writer.partial_path}")
+        asyncio.run(
+            scrape_quests_async(
+                [q for q in quest_links if q["href"] not in done],
+                writer,
+                concurrency=args.concurrency,
+                bucket=TokenBucket(args.rate, args.burst),
+                executor=executor,
+                parse_workers=max(1, args.parse_workers),
+                base_url=args.base_url,
+                previous=previous,
+                parser=args.parser,
+                full_page=args.full_page,
+            )
+        )
+    save_state(hashes_path, writer.results, stored, all_hrefs)
+    print(f"Wrote {writer.count} quests to {args.out}")
+    if args.incremental:
+        report_changes(previous, all_hrefs, writer.results)
+    if cache:
+        print(f"HTTP cache: {cache.revalidated} unchanged (304), {cache.downloaded} downloaded")
+
+
+if __name__ == "__main__":
+    main()
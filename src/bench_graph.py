@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+
+from quest_graph import LAYERINGS, REACH_MAX_PAIRS, Edge, adjacency_lists, reachability_index
+from quest_layout import layered_layout
+from quest_payload import encode_reach, json_script
+from quest_tree import build_graph
+
+TRADERS = ["Prapor", "Therapist", "Skier", "Peacekeeper", "Mechanic", "Ragman", "Jaeger", "Fence", "Lightkeeper"]
+LOCATIONS = ["Customs", "Woods", "Interchange", "Shoreline", "Reserve", "Lighthouse", "Streets of Tarkov", "Any"]
+
+
+def synthetic_quests(count: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A quests.csv-shaped frame of `count` quests, each chained to one or two earlier quests.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for idx in range(count):
+        parents = sorted({rng.randrange(max(0, idx - 50), idx) for _ in range(rng.randint(1, 2))}) if idx else []
+        rows.append({
+            "name": f"Quest {idx}",
+            "location": rng.choice(LOCATIONS),
+            "given_by": rng.choice(TRADERS),
+            "dialogue": "|".join(f"Line {n} of quest {idx}" for n in range(rng.randint(0, 3))),
+            "requirements": f"Must be level {rng.randint(1, 60)}" if rng.random() < 0.6 else "",
+            "objectives": "|".join(f"Objective {n}" for n in range(rng.randint(1, 4))),
+            "rewards": f"+{rng.randint(1, 50) * 100} EXP|{rng.choice(TRADERS)} Rep +0.02",
+            "previous": "|".join(f"Quest {p}" for p in parents),
+            "leads_to": f"Quest {idx + 1}" if idx + 1 < count and rng.random() < 0.3 else "",
+        })
+    return pd.DataFrame(rows)
+
+
+def sparse_wide_graph(count: int) -> Tuple[List[str], List[Edge]]:
+    """
+    `count` quests in disjoint pairs (A -> B): about count / 2 reachable pairs over a wide graph, where the
+    reachability index should cost what the pairs cost and not the graph's width squared.
+    """
+    names = [f"Quest {idx}" for idx in range(count)]
+    return names, [(names[idx], names[idx + 1]) for idx in range(0, count - 1, 2)]
+
+
+def time_reach(names: List[str], edges: List[Edge], max_pairs: int, label: str) -> None:
+    start = time.perf_counter()
+    reach = reachability_index(names, edges, max_pairs)
+    elapsed = time.perf_counter() - start
+    encoded = json_script(encode_reach(reach))
+    if "descendant_counts" in reach:
+        shape = f"{sum(reach['descendant_counts'])} pairs, counts only"
+    else:
+        shape = f"{sum(map(len, reach['descendants']))} pairs, lists"
+    print(f"{label:>9}: {elapsed:.2f}s, {shape}, {len(encoded.encode('utf-8')) / 1024:.0f} KiB in the page")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time build_graph on a synthetic quests CSV.")
+    parser.add_argument("--quests", type=int, default=100_000, help="Number of synthetic quests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", type=Path, help="Time an existing quests CSV instead of a synthetic one")
+    parser.add_argument(
+        "--reach-max-pairs",
+        type=int,
+        default=REACH_MAX_PAIRS,
+        help="Ship ancestor/descendant lists up to this many pairs (raise it to time the lists on large graphs)",
+    )
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv, encoding="utf-8")
+    else:
+        # Round-trip through a CSV so the frame has the same NaNs and dtypes as src/quests.csv.
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "quests.csv"
+            synthetic_quests(args.quests, args.seed).to_csv(path, index=False, encoding="utf-8")
+            df = pd.read_csv(path, encoding="utf-8")
+
+    start = time.perf_counter()
+    nodes, links = build_graph(df, {})
+    elapsed = time.perf_counter() - start
+    print(f"{len(df)} rows -> {len(nodes)} nodes, {len(links)} links in {elapsed:.2f}s")
+
+    names = [n["id"] for n in nodes]
+    edges = [(l["source"], l["target"]) for l in links]
+    adjacency = adjacency_lists(names, edges)
+    for name, layering in LAYERINGS.items():
+        start = time.perf_counter()
+        levels = layering(adjacency)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>9} layering: {elapsed * 1000:.0f} ms, {max(levels, default=-1) + 1} levels")
+
+    time_reach(names, edges, args.reach_max_pairs, "reach")
+    time_reach(*sparse_wide_graph(len(names)), args.reach_max_pairs, "sparse reach")
+
+    start = time.perf_counter()
+    layered_layout(names, edges, [n["level"] for n in nodes])
+    elapsed = time.perf_counter() - start
+    print(f"   layout: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
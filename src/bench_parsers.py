@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from quest_parsers import available_parsers
+from scraper import DEFAULT_CACHE_DIR, parse_quest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time each HTML parser backend over saved quest pages.")
+    parser.add_argument(
+        "--pages",
+        default=DEFAULT_CACHE_DIR,
+        type=Path,
+        help="Directory of saved quest pages (*.html); the scraper's HTTP cache works as-is",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Parse every page this many times per backend")
+    args = parser.parse_args()
+
+    pages = [p.read_text(encoding="utf-8") for p in sorted(args.pages.glob("**/*.html"))]
+    if not pages:
+        raise SystemExit(f"No *.html pages found under {args.pages}")
+
+    # The first run (bs4 over the full page) is the reference for both speed and output.
+    baseline = None
+    for name in available_parsers():
+        for full_page in (True, False):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                rows = [parse_quest(html, str(idx), name, full_page).as_row() for idx, html in enumerate(pages)]
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = (elapsed, rows)
+            same = "identical" if rows == baseline[1] else "DIFFERENT"
+            per_page = elapsed / (len(pages) * args.repeat) * 1000
+            label = f"{name} ({'full page' if full_page else 'article'})"
+            print(f"{label:>16}: {elapsed:.2f}s ({per_page:.2f} ms/page, {baseline[0] / elapsed:.1f}x, {same} rows)")
+
+
+if __name__ == "__main__":
+    main()
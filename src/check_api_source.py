@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import wiki_api
+import wiki_http
+from scraper import USER_AGENT, parse_quest, scrape_quests_api
+
+DEFAULT_FIXTURES = "src/fixtures/wiki_api_synthetic"
+
+
+def page_path(fixtures: Path, href: str) -> Path:
+    return fixtures / "pages" / (wiki_api.title_from_href(href).replace(" ", "_") + ".html")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the rows --source api builds with the rows parsed from rendered pages, from saved fixtures. "
+            "The default fixtures are synthetic; record real ones with --record before trusting a clean run."
+        )
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=DEFAULT_FIXTURES,
+        type=Path,
+        help="Directory with links.json, api.php responses (api/) and the rendered quest pages (pages/)",
+    )
+    parser.add_argument("--api-url", default=wiki_api.DEFAULT_API_URL, help="api.php endpoint used with --record")
+    parser.add_argument("--record", action="store_true", help="Fetch the quests in links.json live and save them first")
+    args = parser.parse_args()
+
+    quest_links = json.loads((args.fixtures / "links.json").read_text(encoding="utf-8"))
+    if args.record:
+        for q in quest_links:
+            path = page_path(args.fixtures, q["href"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(wiki_http.fetch_html(q["href"], USER_AGENT), encoding="utf-8")
+
+    client = wiki_api.ApiClient(args.api_url, fixtures=args.fixtures / "api", record=args.record)
+    api_rows = {r.href: r.quest.as_row() for r in scrape_quests_api(quest_links, client)}
+    mismatches = 0
+    for q in quest_links:
+        api_row = api_rows.get(q["href"])
+        if api_row is None:
+            mismatches += 1
+            print(f"{q['title']}: no row from the API")
+            continue
+        html_row = parse_quest(page_path(args.fixtures, q["href"]).read_text(encoding="utf-8"), q["href"]).as_row()
+        for field, value in html_row.items():
+            if api_row[field] != value:
+                mismatches += 1
+                print(f"{q['title']} / {field}:\n  html: {value!r}\n   api: {api_row[field]!r}")
+    kind = "synthetic" if args.fixtures.name.endswith("_synthetic") else "recorded"
+    print(f"{len(quest_links)} quests ({kind} fixtures), {mismatches} mismatching fields")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+// Headless check of the generated page: runs the inline scripts of index.html against a stand-in DOM and d3,
+// then compares what the page decodes (graph, reach, details), its availability bookkeeping and its search
+// index with the graph quest_tree.py builds from src/quests.csv.
+//
+//   node src/check_page.mjs [--html index.html] [--layering shortest] [--python python3]
+//
+// Run it from the repository root after `python src/quest_tree.py`, with the same --layering.
+import { spawnSync } from "node:child_process";
+import fs from "node:fs";
+import path from "node:path";
+import { parseArgs } from "node:util";
+import vm from "node:vm";
+
+const { values: args } = parseArgs({
+  options: {
+    html: { type: "string", default: "index.html" },
+    layering: { type: "string", default: "shortest" },
+    python: { type: "string", default: process.env.PYTHON || "python3" },
+    ops: { type: "string", default: "2000" },
+  },
+});
+
+// Python side: the nodes, links and full reachability lists before encoding.
+const REFERENCE_SCRIPT = `
+import json, sys
+from quest_graph import reachability_index
+from quest_tree import load_graph
+nodes, links = load_graph(sys.argv[1])
+reach = reachability_index([n["id"] for n in nodes], [(l["source"], l["target"]) for l in links], max_pairs=sys.maxsize)
+json.dump({"nodes": nodes, "links": links, "reach": reach}, sys.stdout, ensure_ascii=False)
+`;
+
+function loadReference() {
+  const env = { ...process.env, PYTHONPATH: ["src", process.env.PYTHONPATH].filter(Boolean).join(path.delimiter) };
+  const run = spawnSync(args.python, ["-c", REFERENCE_SCRIPT, args.layering], { env, encoding: "utf-8", maxBuffer: 1 << 30 });
+  if (run.status !== 0) throw new Error(`${args.python} failed:\n${run.stderr || run.error}`);
+  return JSON.parse(run.stdout);
+}
+
+// --- stand-in browser ------------------------------------------------------------------------------
+
+// Any d3 call chain that isn't a selection (scales, zoom, forces, quadtree...) returns another no-op chain.
+function chain() {
+  return new Proxy(function () {}, {
+    get(_, key) {
+      if (key === Symbol.toPrimitive) return () => 0;
+      if (key === Symbol.iterator) return function* () {};
+      if (key === "then") return undefined;
+      return chain();
+    },
+    apply: () => chain(),
+  });
+}
+
+// Selections keep their data and run attribute callbacks, so the page's per-datum code executes.
+const elementFor = new WeakMap();
+class Selection {
+  constructor(data) { this._data = data || [{}]; }
+  _each(value) {
+    if (typeof value === "function") this._data.forEach((d, i) => value(d, i));
+    return this;
+  }
+  select() { return new Selection(this._data); }
+  selectAll() { return new Selection([]); }
+  append() { return new Selection(this._data); }
+  insert() { return new Selection(this._data); }
+  data(data) { return new Selection(data); }
+  datum(d) { return new Selection([d]); }
+  join() { return this; }
+  enter() { return this; }
+  exit() { return this; }
+  attr(_, value) { return this._each(value); }
+  style(_, value) { return this._each(value); }
+  classed(_, value) { return this._each(value); }
+  text(value) { return this._each(value); }
+  property(_, value) { return this._each(value); }
+  each(value) { return this._each(value); }
+  call(fn, ...rest) { if (typeof fn === "function") fn(this, ...rest); return this; }
+  on() { return this; }
+  filter(f) { return new Selection(typeof f === "function" ? this._data.filter(f) : this._data); }
+  transition() { return this; }
+  duration() { return this; }
+  raise() { return this; }
+  lower() { return this; }
+  remove() { return this; }
+  node() { return makeElement("svg"); }
+  nodes() {
+    return this._data.map(d => {
+      if (!d || typeof d !== "object") return null;
+      if (!elementFor.has(d)) elementFor.set(d, { style: {}, datum: d });
+      return elementFor.get(d);
+    });
+  }
+  size() { return this._data.length; }
+}
+
+function makeContext2d() {
+  return new Proxy({}, {
+    get: (state, key) => (key in state ? state[key] : () => {}),
+    set: (state, key, value) => { state[key] = value; return true; },
+  });
+}
+
+function makeElement(tag, id) {
+  const classes = new Set();
+  const sub = {};
+  return {
+    id, tagName: String(tag).toUpperCase(), children: [], options: [], style: {}, dataset: {},
+    textContent: "", value: "", checked: false, files: null, _html: "",
+    classList: {
+      toggle(c, force) { const on = force === undefined ? !classes.has(c) : !!force; on ? classes.add(c) : classes.delete(c); return on; },
+      add: (...cs) => cs.forEach(c => classes.add(c)),
+      remove: (...cs) => cs.forEach(c => classes.delete(c)),
+      contains: c => classes.has(c),
+    },
+    get innerHTML() { return this._html; },
+    set innerHTML(v) { this._html = v; this.children = []; this.options = []; },
+    appendChild(child) { this.children.push(child); if (child.tagName === "OPTION") this.options.push(child); return child; },
+    append(...cs) { cs.forEach(c => this.appendChild(c)); },
+    replaceChildren(...cs) { this.children = []; this.options = []; cs.forEach(c => this.appendChild(c)); },
+    remove() {},
+    click() {},
+    setAttribute(k, v) { this[k] = v; },
+    getAttribute(k) { return this[k]; },
+    addEventListener() {},
+    removeEventListener() {},
+    querySelector: sel => (sub[sel] ||= makeElement("div")),
+    querySelectorAll: () => [],
+    getContext() { return (this._ctx ||= makeContext2d()); },
+    getBoundingClientRect: () => ({ left: 0, top: 0, width: 1000, height: 800 }),
+  };
+}
+
+function runPage(html) {
+  const byId = {};
+  const storage = new Map();
+  const context = {
+    console,
+    setTimeout: () => 0,
+    clearTimeout: () => {},
+    setInterval: () => 0,
+    clearInterval: () => {},
+    requestAnimationFrame: () => 0,
+    cancelAnimationFrame: () => {},
+    performance,
+    localStorage: {
+      getItem: k => (storage.has(k) ? storage.get(k) : null),
+      setItem: (k, v) => storage.set(k, String(v)),
+      removeItem: k => storage.delete(k),
+    },
+    confirm: () => true,
+    Blob: class { constructor(parts) { this.parts = parts; } },
+    URL: { createObjectURL: () => "blob:page", revokeObjectURL: () => {} },
+    document: {
+      getElementById: id => (byId[id] ||= makeElement("div", id)),
+      querySelector: sel => (byId[sel] ||= makeElement("div", sel)),
+      querySelectorAll: () => [],
+      createElement: tag => makeElement(tag),
+      createTextNode: t => ({ textContent: t }),
+      body: makeElement("body"),
+      addEventListener: () => {},
+    },
+    d3: new Proxy({}, {
+      get: (_, key) => (key === "select" || key === "selectAll" ? () => new Selection([{}]) : chain()),
+    }),
+    TextEncoder, TextDecoder, atob, btoa,
+    fetch: () => Promise.reject(new Error("offline")),
+    innerWidth: 1600,
+    innerHeight: 900,
+    devicePixelRatio: 1,
+    addEventListener: () => {},
+  };
+  context.window = context.self = context;
+  vm.createContext(context);
+
+  // Data blocks (<script type="application/json" id=...>) become elements the page reads by id.
+  for (const m of html.matchAll(/<script[^>]*\bid="([^"]+)"[^>]*>([\s\S]*?)<\/script>/g)) {
+    byId[m[1]] = makeElement("script", m[1]);
+    byId[m[1]].textContent = m[2];
+  }
+  const scripts = [...html.matchAll(/<script(?![^>]*\bsrc=)([^>]*)>([\s\S]*?)<\/script>/g)]
+    .filter(m => !/type="(?!module|text\/javascript)/.test(m[1]));
+  for (const m of scripts) vm.runInContext(m[2], context, { filename: args.html });
+  // Top-level const/let/function bindings of the page script, as seen from inside its context.
+  return name => vm.runInContext(name, context);
+}
+
+// --- checks ---------------------------------------------------------------------------------------
+
+const failures = [];
+function fail(message) {
+  failures.push(message);
+  if (failures.length <= 20) console.log(`  ${message}`);
+}
+
+function canonical(value) {
+  if (Array.isArray(value) || ArrayBuffer.isView(value)) return `[${Array.from(value, canonical).join(",")}]`;
+  if (value && typeof value === "object") {
+    return `{${Object.keys(value).sort().map(k => `${JSON.stringify(k)}:${canonical(value[k])}`).join(",")}}`;
+  }
+  return JSON.stringify(value === undefined ? null : value);
+}
+
+function sameSet(a, b) {
+  const left = new Set(a);
+  return left.size === new Set(b).size && [...b].every(x => left.has(x));
+}
+
+const NODE_FIELDS = ["id", "name", "location", "given_by", "url", "required_level", "level", "rewards", "previous", "leads_to", "reward"];
+const DETAIL_FIELDS = ["dialogue", "requirements", "objectives"];
+
+function checkGraph(page, ref) {
+  const nodes = page("nodes");
+  const links = page("links");
+  if (nodes.length !== ref.nodes.length) return fail(`graph: ${nodes.length} nodes, expected ${ref.nodes.length}`);
+  ref.nodes.forEach((expected, i) => {
+    for (const field of NODE_FIELDS) {
+      if (canonical(nodes[i][field]) !== canonical(expected[field])) fail(`graph: ${expected.id} / ${field} differs`);
+    }
+    const details = page("questDetails")(nodes[i]);
+    for (const field of DETAIL_FIELDS) {
+      if (canonical(details[field]) !== canonical(expected[field])) fail(`details: ${expected.id} / ${field} differs`);
+    }
+  });
+  const pageLinks = links.map(l => `${l.source.id ?? l.source} -> ${l.target.id ?? l.target}`);
+  const refLinks = ref.links.map(l => `${l.source} -> ${l.target}`);
+  if (canonical(pageLinks) !== canonical(refLinks)) fail(`graph: links differ (${pageLinks.length} vs ${refLinks.length})`);
+}
+
+function checkReach(page, ref) {
+  const reach = page("reach");
+  ref.nodes.forEach((n, i) => {
+    if (!sameSet(reach.ancestors(i), ref.reach.ancestors[i])) fail(`reach: ancestors of ${n.id} differ`);
+    if (!sameSet(reach.descendants(i), ref.reach.descendants[i])) fail(`reach: descendants of ${n.id} differ`);
+    if (reach.descendantCounts[i] !== ref.reach.descendants[i].length) fail(`reach: descendant count of ${n.id} differs`);
+  });
+}
+
+// A quest is available when it isn't completed and at least one of its prerequisites is.
+function expectedAvailable(ref, completed) {
+  const available = new Set();
+  ref.links.forEach(l => {
+    if (completed.has(l.source) && !completed.has(l.target)) available.add(l.target);
+  });
+  return available;
+}
+
+function checkAvailability(page, ref) {
+  const setStatus = page("setStatus");
+  const replaceProgress = page("replaceProgress");
+  const completed = new Set();
+  let seed = 7;
+  const rand = () => ((seed = (seed * 1103515245 + 12345) & 0x7fffffff) / 0x7fffffff);
+  const compare = (label) => {
+    const expected = expectedAvailable(ref, completed);
+    if (!sameSet(page("availableSet"), expected)) return fail(`availability: set differs after ${label}`), false;
+    return true;
+  };
+  const ops = Number(args.ops);
+  for (let k = 0; k < ops; k++) {
+    const id = ref.nodes[Math.floor(rand() * ref.nodes.length)].id;
+    const done = rand() < 0.6;
+    setStatus(id, done ? "completed" : "none");
+    done ? completed.add(id) : completed.delete(id);
+    if (!compare(`setStatus #${k}`)) break;
+  }
+  // Bulk path (page load / import): rebuild every counter from a progress map.
+  replaceProgress(new Map([...completed].map(id => [id, "completed"])), null);
+  compare("replaceProgress");
+  completed.clear();
+  replaceProgress(new Map(), null);
+  compare("clearing progress");
+}
+
+// The page's search, reimplemented over the Python reward lists: keys in order of first appearance.
+function expectedSearch(ref, mode, term) {
+  if (mode === "name") return ref.nodes.filter(n => n.name.toLowerCase().includes(term)).map(n => [n.name, []]);
+  const groups = new Map();
+  ref.nodes.forEach(n => {
+    const hits = mode === "reward"
+      ? n.reward.items.map(item => [item.name, [n.name, item.count, null, null]])
+      : n.reward.unlocks.filter(u => u.kind).map(u => [u.item, [n.name, 1, u.kind, u.place || ""]]);
+    hits.forEach(([key, hit]) => (groups.get(key) || groups.set(key, []).get(key)).push(hit));
+  });
+  return [...groups].filter(([key]) => key.toLowerCase().includes(term));
+}
+
+function pageSearch(page, mode, term) {
+  const index = page("loadSearchIndex")();
+  const nodes = page("nodes");
+  const section = index[mode];
+  const ids = page("matchingKeys")(section, term);
+  if (mode === "name") return ids.map(id => [nodes[id].name, []]);
+  return ids.map(id => [
+    section.keys[id],
+    section.hits[id].map(h => [h.node.name, h.count, h.kind ?? null, h.kind ? h.place : null]),
+  ]);
+}
+
+function checkSearch(page, ref) {
+  const terms = new Set(["a", "e", "ak", "74", "sal", "gas", "ammo", "m4a1", "x39", "pistol", "zzz", "key", "the", " ", "-"]);
+  ref.nodes.forEach((n, i) => {
+    if (i % 7 === 0) terms.add(n.name.toLowerCase().slice(1, 5));
+    n.reward.items.forEach((item, j) => { if ((i + j) % 3 === 0) terms.add(item.name.toLowerCase().slice(-6, -1)); });
+    n.reward.unlocks.forEach(u => terms.add(u.item.toLowerCase().slice(0, 4)));
+  });
+  for (const mode of ["name", "reward", "unlock"]) {
+    for (const term of terms) {
+      if (canonical(pageSearch(page, mode, term)) !== canonical(expectedSearch(ref, mode, term))) {
+        fail(`search: ${mode} ${JSON.stringify(term)} differs`);
+      }
+    }
+  }
+  return terms.size * 3;
+}
+
+const ref = loadReference();
+const page = runPage(fs.readFileSync(args.html, "utf-8"));
+console.log(`${args.html}: ${ref.nodes.length} quests, ${ref.links.length} links`);
+const steps = [
+  ["graph and details", () => checkGraph(page, ref)],
+  ["reachability", () => checkReach(page, ref)],
+  ["availability", () => checkAvailability(page, ref)],
+  ["search", () => checkSearch(page, ref)],
+];
+for (const [label, check] of steps) {
+  const before = failures.length;
+  check();
+  console.log(`${label}: ${failures.length === before ? "ok" : `${failures.length - before} mismatches`}`);
+}
+if (failures.length) process.exit(1);
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+# Filter facets for the page's filter panel. Every facet value maps to the set of quests (node indices)
+# that match it, stored as a bitset: bit i is set when nodes[i] matches.
+FACETS = ["trader", "location", "unlock"]
+
+
+def location_list(raw: Optional[str]) -> List[str]:
+    """
+    "Customs, Woods" -> ["Customs", "Woods"] (same split the filter panel has always used).
+    """
+    if not raw:
+        return []
+    return [part.strip() for part in str(raw).split(",") if part.strip()]
+
+
+def facet_values(node: dict, facet: str) -> List[str]:
+    if facet == "trader":
+        return [node["given_by"]] if node["given_by"] else []
+    if facet == "location":
+        return location_list(node["location"])
+    return [unlock["kind"] for unlock in node["reward"]["unlocks"] if unlock["kind"]]
+
+
+def facet_bitsets(nodes: List[dict]) -> Dict[str, dict]:
+    """
+    {facet: {"values": {value: bitset}, "unknown": bitset}} with values sorted by name. "unknown" holds
+    the quests with no value for the facet (0 if there are none).
+    """
+    facets = {}
+    for facet in FACETS:
+        values: Dict[str, int] = {}
+        unknown = 0
+        for idx, node in enumerate(nodes):
+            found = facet_values(node, facet)
+            if not found:
+                unknown |= 1 << idx
+            for value in found:
+                values[value] = values.get(value, 0) | 1 << idx
+        facets[facet] = {"values": dict(sorted(values.items())), "unknown": unknown}
+    return facets
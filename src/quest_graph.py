@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+# Graph algorithms for the quest tree. Nodes are indexed 0..n-1; adjacency[i] lists the quests i leads to.
+Edge = Tuple[str, str]
+# Past this many (quest, descendant) pairs the ancestor/descendant lists grow too large to ship, and the
+# page walks the links instead (about 6 bytes of JSON per pair and direction).
+REACH_MAX_PAIRS = 200_000
+
+
+def adjacency_lists(names: List[str], edges: Iterable[Edge]) -> List[List[int]]:
+    index = {name: idx for idx, name in enumerate(names)}
+    adjacency: List[List[int]] = [[] for _ in names]
+    for source, target in edges:
+        adjacency[index[source]].append(index[target])
+    return adjacency
+
+
+def indegrees(adjacency: List[List[int]]) -> List[int]:
+    counts = [0] * len(adjacency)
+    for targets in adjacency:
+        for target in targets:
+            counts[target] += 1
+    return counts
+
+
+def shortest_levels(adjacency: List[List[int]]) -> List[int]:
+    """
+    Multi-source BFS depth from every quest without prerequisites (or from all quests if there are none).
+    Each node is enqueued once, on first reach; nodes only reachable through a cycle stay at level 0.
+    """
+    indegree = indegrees(adjacency)
+    roots = [idx for idx, deg in enumerate(indegree) if deg == 0] or list(range(len(adjacency)))
+    levels = [-1] * len(adjacency)
+    for root in roots:
+        levels[root] = 0
+    queue = deque(roots)
+    while queue:
+        cur = queue.popleft()
+        next_level = levels[cur] + 1
+        for target in adjacency[cur]:
+            if levels[target] < 0:
+                levels[target] = next_level
+                queue.append(target)
+    return [max(level, 0) for level in levels]
+
+
+def strongly_connected_components(adjacency: List[List[int]]) -> Tuple[List[int], int]:
+    """
+    Iterative Tarjan: (component id per node, number of components).
+    """
+    count = len(adjacency)
+    order = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    component = [-1] * count
+    visited = components = 0
+
+    for root in range(count):
+        if order[root] >= 0:
+            continue
+        order[root] = low[root] = visited
+        visited += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, pos = work[-1]
+            targets = adjacency[node]
+            if pos < len(targets):
+                work[-1] = (node, pos + 1)
+                target = targets[pos]
+                if order[target] < 0:
+                    order[target] = low[target] = visited
+                    visited += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, 0))
+                elif on_stack[target]:
+                    low[node] = min(low[node], order[target])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = components
+                    if member == node:
+                        break
+                components += 1
+    return component, components
+
+
+def longest_path_levels(adjacency: List[List[int]]) -> List[int]:
+    """
+    Longest-path layering: every quest sits one level below its deepest prerequisite. Cycles are
+    condensed into one strongly connected component first, so all quests in a cycle share a level.
+    """
+    component, count = strongly_connected_components(adjacency)
+    successors: List[set] = [set() for _ in range(count)]
+    for source, targets in enumerate(adjacency):
+        for target in targets:
+            if component[source] != component[target]:
+                successors[component[source]].add(component[target])
+
+    # Kahn's algorithm over the condensed DAG, pushing depths forward in topological order.
+    indegree = indegrees([list(targets) for targets in successors])
+    queue = deque(c for c in range(count) if indegree[c] == 0)
+    depth = [0] * count
+    while queue:
+        cur = queue.popleft()
+        for nxt in successors[cur]:
+            depth[nxt] = max(depth[nxt], depth[cur] + 1)
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+    return [depth[component[idx]] for idx in range(len(adjacency))]
+
+
+LAYERINGS = {
+    "shortest": shortest_levels,
+    "longest": longest_path_levels,
+}
+DEFAULT_LAYERING = "shortest"
+
+
+def assign_levels(names: List[str], edges: Iterable[Edge], layering: str = DEFAULT_LAYERING) -> Dict[str, int]:
+    if layering not in LAYERINGS:
+        raise ValueError(f"Unknown layering {layering!r}; choose from {', '.join(LAYERINGS)}")
+    levels = LAYERINGS[layering](adjacency_lists(names, edges))
+    return dict(zip(names, levels))
+
+
+def find_cycles(names: List[str], edges: Iterable[Edge]) -> List[List[str]]:
+    """
+    Quests that are each other's prerequisites: every strongly connected component with more than one
+    quest, plus quests that lead to themselves.
+    """
+    adjacency = adjacency_lists(names, edges)
+    component, count = strongly_connected_components(adjacency)
+    members: List[List[str]] = [[] for _ in range(count)]
+    for idx, comp in enumerate(component):
+        members[comp].append(names[idx])
+    self_loops = {component[idx] for idx, targets in enumerate(adjacency) if idx in targets}
+    return [group for comp, group in enumerate(members) if len(group) > 1 or comp in self_loops]
+
+
+def reversed_adjacency(adjacency: List[List[int]]) -> List[List[int]]:
+    parents: List[List[int]] = [[] for _ in adjacency]
+    for source, targets in enumerate(adjacency):
+        for target in targets:
+            parents[target].append(source)
+    return parents
+
+
+def condensation(adjacency: List[List[int]]) -> Tuple[List[int], List[List[int]], List[set]]:
+    """
+    (component per node, member nodes of each strongly connected component, successor components of
+    each component), with components in Tarjan's reverse topological order.
+    """
+    component, count = strongly_connected_components(adjacency)
+    members: List[List[int]] = [[] for _ in range(count)]
+    successors: List[set] = [set() for _ in range(count)]
+    for source, targets in enumerate(adjacency):
+        members[component[source]].append(source)
+        for target in targets:
+            if component[source] != component[target]:
+                successors[component[source]].add(component[target])
+    return component, members, successors
+
+
+def closure_bits(members: List[List[int]], successors: List[set]) -> Iterator[Tuple[int, int, int]]:
+    """
+    For a condensation(): (component, base, bits) per component, in reverse topological order so every
+    successor's set is ready before it is needed. Node base + i is reachable from the component (its own
+    members included) when bit i is set. Offsetting by the lowest node keeps each bitset as long as the
+    span it covers rather than the whole graph, and a component's bitset is dropped once every component
+    leading to it has used it, so only the current frontier is held in memory.
+    """
+    waiting = [0] * len(members)
+    for targets in successors:
+        for nxt in targets:
+            waiting[nxt] += 1
+
+    reach: List[Tuple[int, int]] = [(0, 0)] * len(members)
+    for comp, own in enumerate(members):
+        parts = [(node, 1) for node in own] + [reach[nxt] for nxt in successors[comp]]
+        base = min(part_base for part_base, _ in parts)
+        bits = 0
+        for part_base, part_bits in parts:
+            bits |= part_bits << (part_base - base)
+        for nxt in successors[comp]:
+            waiting[nxt] -= 1
+            if not waiting[nxt]:
+                reach[nxt] = (0, 0)
+        if waiting[comp]:
+            reach[comp] = (base, bits)
+        yield comp, base, bits
+
+
+def set_bits(base: int, bits: int) -> List[int]:
+    """
+    base + the index of every set bit in `bits`. Spans of up to 64 bits are walked directly, which beats
+    numpy's per-call overhead on the many small sets of a sparse graph.
+    """
+    if bits.bit_length() <= 64:
+        found = []
+        while bits:
+            low = bits & -bits
+            found.append(base + low.bit_length() - 1)
+            bits ^= low
+        return found
+    packed = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return (np.flatnonzero(np.unpackbits(packed, bitorder="little")) + base).tolist()
+
+
+def reachable_sets(adjacency: List[List[int]]) -> List[List[int]]:
+    """
+    Transitive closure: for every node, the sorted indices of all other nodes reachable from it, from
+    one closure_bits bitset per strongly connected component.
+    """
+    component, members, successors = condensation(adjacency)
+    sets: List[List[int]] = [[] for _ in adjacency]
+    for comp, base, bits in closure_bits(members, successors):
+        reachable = set_bits(base, bits)
+        for idx in members[comp]:
+            # Other members of a cycle reach each other, and the node itself is always left out.
+            others = reachable.copy() if len(members[comp]) > 1 else reachable
+            others.remove(idx)
+            sets[idx] = others
+    return sets
+
+
+def reachable_counts(adjacency: List[List[int]]) -> List[int]:
+    """
+    len() of every reachable_sets entry without building the lists.
+    """
+    component, members, successors = condensation(adjacency)
+    sizes = [0] * len(members)
+    for comp, _, bits in closure_bits(members, successors):
+        sizes[comp] = bits.bit_count()
+    return [sizes[component[idx]] - 1 for idx in range(len(adjacency))]
+
+
+def reachability_index(names: List[str], edges: Iterable[Edge], max_pairs: int = REACH_MAX_PAIRS) -> dict:
+    """
+    Ancestors (every quest needed first) and descendants (every quest it eventually unlocks) per node,
+    as indices into `names`. When there are more than `max_pairs` (quest, descendant) pairs, only
+    {"descendant_counts"} is returned and the sets are left to a walk over the links.
+    """
+    adjacency = adjacency_lists(names, edges)
+    counts = reachable_counts(adjacency)
+    if sum(counts) > max_pairs:
+        return {"descendant_counts": counts}
+    return {
+        "ancestors": reachable_sets(reversed_adjacency(adjacency)),
+        "descendants": reachable_sets(adjacency),
+    }
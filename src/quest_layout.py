@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from quest_graph import Edge, adjacency_lists, reversed_adjacency
+
+# Layered (Sugiyama-style) layout of the quest graph: one column per level, quests ordered within their
+# column to reduce edge crossings, then placed near the quests they connect to. Deterministic, so the page
+# can show it as-is instead of running a force simulation on load.
+MARGIN = 100  # same as `margin` / `columnGap` in the page
+COLUMN_GAP = 220
+ROW_GAP = 40
+ORDER_SWEEPS = 24
+PLACE_SWEEPS = 2
+
+
+def column_lists(levels: List[int]) -> List[List[int]]:
+    columns: List[List[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for idx, level in enumerate(levels):
+        columns[level].append(idx)
+    return columns
+
+
+def centred_rows(column: List[int], ys: List[float]) -> None:
+    offset = (len(column) - 1) / 2
+    for rank, idx in enumerate(column):
+        ys[idx] = (rank - offset) * ROW_GAP
+
+
+def count_crossings(columns: List[List[int]], adjacency: List[List[int]], levels: List[int]) -> int:
+    """
+    Crossings between neighbouring columns: edges sorted by source rank (then target rank), counting for
+    each edge the earlier edges that end below it, with a Fenwick tree over target ranks.
+    """
+    rank = [0] * len(levels)
+    for column in columns:
+        for pos, idx in enumerate(column):
+            rank[idx] = pos
+    total = 0
+    for level, column in enumerate(columns[:-1]):
+        tree = [0] * (len(columns[level + 1]) + 1)
+        seen = 0
+        for source in column:
+            targets = sorted(rank[t] for t in adjacency[source] if levels[t] == level + 1)
+            for target in targets:
+                pos = target + 1
+                while pos:
+                    total -= tree[pos]
+                    pos -= pos & -pos
+                total += seen
+            for target in targets:
+                pos = target + 1
+                while pos < len(tree):
+                    tree[pos] += 1
+                    pos += pos & -pos
+                seen += 1
+    return total
+
+
+def order_columns(levels: List[int], adjacency: List[List[int]]) -> List[List[int]]:
+    """
+    Barycenter heuristic: alternate sweeps left-to-right (ordering by prerequisites) and right-to-left
+    (ordering by follow-ups), keeping the ordering with the fewest crossings. Ties keep the current order.
+    """
+    parents = reversed_adjacency(adjacency)
+    columns = column_lists(levels)
+    ys = [0.0] * len(levels)
+    for column in columns:
+        centred_rows(column, ys)
+
+    best = [list(column) for column in columns]
+    best_crossings = count_crossings(columns, adjacency, levels)
+    for sweep in range(ORDER_SWEEPS):
+        forward = sweep % 2 == 0
+        neighbours = parents if forward else adjacency
+        order = range(1, len(columns)) if forward else range(len(columns) - 2, -1, -1)
+        for level in order:
+            column = columns[level]
+            keys = {}
+            for idx in column:
+                placed = [ys[n] for n in neighbours[idx] if (levels[n] < level if forward else levels[n] > level)]
+                keys[idx] = sum(placed) / len(placed) if placed else ys[idx]
+            column.sort(key=keys.__getitem__)
+            centred_rows(column, ys)
+        crossings = count_crossings(columns, adjacency, levels)
+        if crossings < best_crossings:
+            best = [list(column) for column in columns]
+            best_crossings = crossings
+    return best
+
+
+def pack_column(column: List[int], wanted: Dict[int, float], ys: List[float]) -> None:
+    """
+    Place a column's quests as close to their wanted y as the fixed order and ROW_GAP allow: the average
+    of packing downwards from the top and upwards from the bottom (both keep the gap, so the mean does).
+    """
+    down: List[float] = []
+    for idx in column:
+        down.append(wanted[idx] if not down else max(wanted[idx], down[-1] + ROW_GAP))
+    up: List[float] = []
+    for idx in reversed(column):
+        up.append(wanted[idx] if not up else min(wanted[idx], up[-1] - ROW_GAP))
+    for idx, low, high in zip(column, down, reversed(up)):
+        ys[idx] = (low + high) / 2
+
+
+def place_columns(columns: List[List[int]], adjacency: List[List[int]], levels: List[int]) -> List[float]:
+    """
+    y per quest: start from evenly spaced, centred columns, then repeatedly pull every quest towards the
+    mean y of the quests it connects to.
+    """
+    parents = reversed_adjacency(adjacency)
+    ys = [0.0] * len(levels)
+    for column in columns:
+        centred_rows(column, ys)
+    for sweep in range(PLACE_SWEEPS):
+        order = columns if sweep % 2 == 0 else columns[::-1]
+        for column in order:
+            if not column:
+                continue
+            wanted = {}
+            for idx in column:
+                linked = [ys[n] for n in parents[idx] + adjacency[idx] if levels[n] != levels[idx]]
+                wanted[idx] = sum(linked) / len(linked) if linked else ys[idx]
+            pack_column(column, wanted, ys)
+    return ys
+
+
+def layered_layout(names: List[str], edges: Iterable[Edge], levels: List[int]) -> Dict[str, List[int]]:
+    """
+    {"x", "y"} per quest in `names` order. x is the level's column; y is relative to the middle of the chart.
+    """
+    adjacency = adjacency_lists(names, edges)
+    columns = order_columns(levels, adjacency)
+    ys = place_columns(columns, adjacency, levels)
+    middle = (max(ys, default=0.0) + min(ys, default=0.0)) / 2
+    return {
+        "x": [MARGIN + level * COLUMN_GAP for level in levels],
+        "y": [round(y - middle) for y in ys],
+    }
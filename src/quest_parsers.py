@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup
+
+try:  # Optional fast backend: pip install lxml (or the "fast" extra).
+    import lxml.html as lxml_html
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml_html = None
+
+SECTION_HEADINGS = ["h2", "h3", "h4"]
+SECTION_IDS = ("Dialogue", "Requirements", "Objectives", "Rewards")
+INFOBOX_LABEL = "va-infobox-label"
+INFOBOX_CONTENT = "va-infobox-content"
+DEFAULT_PARSER = "bs4"
+
+
+# Page regions kept by slice_article; everything else (nav, ads, scripts, comments) is dropped before parsing.
+ARTICLE_IDS = ("firstHeading", "mw-content-text")
+_SKIP_MARKUP = r"<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>"
+
+
+def _start_tag(element_id: str):
+    value = re.escape(element_id)
+    return re.compile(
+        rf"<([a-zA-Z][\w-]*)\b[^>]*?(?<=\s)id\s*=\s*(?:\"{value}\"|'{value}'|{value}(?=[\s/>]))[^>]*>"
+    )
+
+
+_ARTICLE_STARTS = [_start_tag(element_id) for element_id in ARTICLE_IDS]
+_TAG_TOKENS: Dict[str, re.Pattern] = {}
+
+
+def element_html(html: str, start_re: re.Pattern) -> Optional[str]:
+    """
+    Return the raw markup of the first element matched by `start_re`, up to its balanced closing tag.
+    """
+    start = start_re.search(html)
+    if start is None:
+        return None
+    tag = start.group(1).lower()
+    if tag not in _TAG_TOKENS:
+        _TAG_TOKENS[tag] = re.compile(rf"{_SKIP_MARKUP}|<(/?){tag}\b[^>]*>", re.IGNORECASE | re.DOTALL)
+    depth = 1
+    for token in _TAG_TOKENS[tag].finditer(html, start.end()):
+        closing = token.group(1)
+        if closing is None:
+            continue  # comment, script or style
+        depth += -1 if closing else 1
+        if depth == 0:
+            return html[start.start() : token.end()]
+    return None
+
+
+def slice_article(html: str) -> Optional[str]:
+    """
+    Cut a fandom page down to the title heading and the article body, or None if either marker is missing.
+    """
+    parts = [element_html(html, start_re) for start_re in _ARTICLE_STARTS]
+    if any(part is None for part in parts):
+        return None
+    return "<html><body>" + "".join(parts) + "</body></html>"
+
+
+@dataclass
+class PageRecord:
+    """
+    Everything scrape_quest needs from one page, collected in a single pass.
+    """
+
+    heading: Optional[str]
+    infobox: List[Tuple[str, Optional[str]]]  # (label text, text of the next content cell), in page order
+    previous: List[str]
+    leads_to: List[str]
+    sections: Dict[str, List[str]]
+
+    def infobox_value(self, label: str) -> Optional[str]:
+        label = label.lower()
+        for label_text, content in self.infobox:
+            if content is not None and label_text.lower().startswith(label):
+                return content
+        return None
+
+
+def related_kind(content_text: str) -> Optional[str]:
+    text = content_text.lower()
+    if text.startswith("previous:"):
+        return "previous"
+    if text.startswith("leads to:"):
+        return "leads_to"
+    return None
+
+
+def pair_infobox_cells(cells: Sequence[Tuple[bool, bool]]) -> List[Optional[int]]:
+    """
+    For (is_label, is_content) flags in document order, return the index of the next content cell after each one.
+    """
+    following: List[Optional[int]] = [None] * len(cells)
+    nxt: Optional[int] = None
+    for idx in range(len(cells) - 1, -1, -1):
+        following[idx] = nxt
+        if cells[idx][1]:
+            nxt = idx
+    return following
+
+
+def get_infobox(soup: BeautifulSoup):
+    return soup.find("table", class_="va-infobox")
+
+
+def extract_infobox_value(soup: BeautifulSoup, label: str) -> Optional[str]:
+    infobox = get_infobox(soup)
+    if not infobox:
+        return None
+    for cell in infobox.find_all("td", class_="va-infobox-label"):
+        if cell.get_text(" ", strip=True).lower().startswith(label.lower()):
+            content = cell.find_next("td", class_="va-infobox-content")
+            if content:
+                return content.get_text(" ", strip=True)
+    return None
+
+
+def extract_related(soup: BeautifulSoup):
+    """
+    Extract 'Previous' and 'Leads to' lists from the infobox related section.
+    """
+    previous, leads_to = [], []
+    infobox = get_infobox(soup)
+    if not infobox:
+        return previous, leads_to
+
+    for cell in infobox.select("td.va-infobox-content"):
+        text = cell.get_text(" ", strip=True).lower()
+        links = [a.get_text(" ", strip=True) for a in cell.select("a[href]")]
+        if text.startswith("previous:"):
+            previous.extend(links)
+        elif text.startswith("leads to:"):
+            leads_to.extend(links)
+    return previous, leads_to
+
+
+def extract_section_lines(soup: BeautifulSoup, section_id: str) -> List[str]:
+    """
+    Return a list of text lines that belong to a section (Objectives, Dialogue, Rewards, etc.).
+    Stops when the next heading of the same level begins.
+    """
+    headline = soup.find(id=section_id)
+    if not headline:
+        return []
+    return section_lines_after(headline)
+
+
+def section_lines_after(headline) -> List[str]:
+    heading = headline.find_parent(SECTION_HEADINGS)
+    if not heading:
+        return []
+
+    lines: List[str] = []
+    for sib in heading.next_siblings:
+        if getattr(sib, "name", None) in SECTION_HEADINGS:
+            break
+        if getattr(sib, "name", None) == "ul":
+            for li in sib.find_all("li", recursive=False):
+                text = li.get_text(" ", strip=True)
+                if text:
+                    lines.append(text)
+        elif getattr(sib, "name", None) == "p":
+            text = sib.get_text(" ", strip=True)
+            if text:
+                lines.append(text)
+    return lines
+
+
+class Bs4Page:
+    """
+    Quest page backed by BeautifulSoup's pure-Python html.parser (the reference output).
+    """
+
+    name = "bs4"
+
+    def __init__(self, html: str):
+        self.soup = BeautifulSoup(html, "html.parser")
+
+    def heading(self) -> Optional[str]:
+        name = self.soup.find("h1", id="firstHeading")
+        return name.get_text(" ", strip=True) if name else None
+
+    def get_infobox(self):
+        return get_infobox(self.soup)
+
+    def extract_infobox_value(self, label: str) -> Optional[str]:
+        return extract_infobox_value(self.soup, label)
+
+    def extract_related(self) -> Tuple[List[str], List[str]]:
+        return extract_related(self.soup)
+
+    def extract_section_lines(self, section_id: str) -> List[str]:
+        return extract_section_lines(self.soup, section_id)
+
+    def extract(self, section_ids: Sequence[str] = SECTION_IDS) -> PageRecord:
+        wanted = set(section_ids)
+        heading = infobox = None
+        headlines = {}
+        for el in self.soup.find_all(True):
+            el_id = el.get("id")
+            if el_id is not None:
+                if heading is None and el_id == "firstHeading" and el.name == "h1":
+                    heading = el
+                if el_id in wanted and el_id not in headlines:
+                    headlines[el_id] = el
+            if infobox is None and el.name == "table" and "va-infobox" in el.get("class", ()):
+                infobox = el
+
+        pairs: List[Tuple[str, Optional[str]]] = []
+        previous: List[str] = []
+        leads_to: List[str] = []
+        if infobox is not None:
+            cells = infobox.find_all("td", class_=[INFOBOX_LABEL, INFOBOX_CONTENT])
+            flags = [(INFOBOX_LABEL in c.get("class", ()), INFOBOX_CONTENT in c.get("class", ())) for c in cells]
+            texts = [c.get_text(" ", strip=True) for c in cells]
+            following = pair_infobox_cells(flags)
+            for idx, (cell, (is_label, is_content)) in enumerate(zip(cells, flags)):
+                if is_label:
+                    nxt = following[idx]
+                    if nxt is not None:
+                        pairs.append((texts[idx], texts[nxt]))
+                    else:
+                        # Same reach as find_next(): the content cell may sit after the infobox.
+                        content = cell.find_next("td", class_=INFOBOX_CONTENT)
+                        pairs.append((texts[idx], content.get_text(" ", strip=True) if content else None))
+                if is_content:
+                    kind = related_kind(texts[idx])
+                    if kind:
+                        links = [a.get_text(" ", strip=True) for a in cell.select("a[href]")]
+                        (previous if kind == "previous" else leads_to).extend(links)
+
+        return PageRecord(
+            heading=heading.get_text(" ", strip=True) if heading is not None else None,
+            infobox=pairs,
+            previous=previous,
+            leads_to=leads_to,
+            sections={sid: section_lines_after(headlines[sid]) if sid in headlines else [] for sid in section_ids},
+        )
+
+
+def xpath_has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+SKIPPED_TEXT_TAGS = ("script", "style", "template")
+
+
+def lxml_text(el, separator: str = " ") -> str:
+    """
+    Same result as bs4's get_text(separator, strip=True): every text node stripped, empties dropped, then joined.
+    """
+    parts: List[str] = []
+
+    def walk(node, is_root: bool) -> None:
+        # Comments, processing instructions and script-like tags contribute no text, but their tails do.
+        if isinstance(node.tag, str) and node.tag not in SKIPPED_TEXT_TAGS:
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child, False)
+        if not is_root and node.tail:
+            parts.append(node.tail)
+
+    walk(el, True)
+    return separator.join(p for p in (part.strip() for part in parts) if p)
+
+
+class LxmlPage:
+    """
+    Quest page backed by lxml's C HTML parser, with the extraction helpers ported to XPath.
+    """
+
+    name = "lxml"
+    INFOBOX = f"//table[{xpath_has_class('va-infobox')}]"
+    LABEL_CELLS = f".//td[{xpath_has_class('va-infobox-label')}]"
+    CONTENT_CELLS = f".//td[{xpath_has_class('va-infobox-content')}]"
+    SCAN = f"//*[@id] | //table[{xpath_has_class('va-infobox')}]"
+    INFOBOX_CELLS = f".//td[{xpath_has_class(INFOBOX_LABEL)} or {xpath_has_class(INFOBOX_CONTENT)}]"
+    NEXT_CONTENT = (
+        f"(descendant::td[{xpath_has_class('va-infobox-content')}]"
+        f" | following::td[{xpath_has_class('va-infobox-content')}])[1]"
+    )
+
+    def __init__(self, html: str):
+        if lxml_html is None:
+            raise RuntimeError("The lxml parser backend needs the lxml package (pip install lxml)")
+        self.root = lxml_html.document_fromstring(html)
+        self._infobox = None
+        self._infobox_found = False
+
+    def heading(self) -> Optional[str]:
+        found = self.root.xpath("//h1[@id='firstHeading']")
+        return lxml_text(found[0]) if found else None
+
+    def get_infobox(self):
+        if not self._infobox_found:
+            found = self.root.xpath(self.INFOBOX)
+            self._infobox = found[0] if found else None
+            self._infobox_found = True
+        return self._infobox
+
+    def extract_infobox_value(self, label: str) -> Optional[str]:
+        infobox = self.get_infobox()
+        if infobox is None:
+            return None
+        for cell in infobox.xpath(self.LABEL_CELLS):
+            if lxml_text(cell).lower().startswith(label.lower()):
+                content = cell.xpath(self.NEXT_CONTENT)
+                if content:
+                    return lxml_text(content[0])
+        return None
+
+    def extract_related(self) -> Tuple[List[str], List[str]]:
+        previous, leads_to = [], []
+        infobox = self.get_infobox()
+        if infobox is None:
+            return previous, leads_to
+
+        for cell in infobox.xpath(self.CONTENT_CELLS):
+            text = lxml_text(cell).lower()
+            links = [lxml_text(a) for a in cell.xpath(".//a[@href]")]
+            if text.startswith("previous:"):
+                previous.extend(links)
+            elif text.startswith("leads to:"):
+                leads_to.extend(links)
+        return previous, leads_to
+
+    def extract_section_lines(self, section_id: str) -> List[str]:
+        found = self.root.xpath("//*[@id=$sid]", sid=section_id)
+        if not found:
+            return []
+        return self.section_lines_after(found[0])
+
+    @staticmethod
+    def section_lines_after(headline) -> List[str]:
+        heading = next((a for a in headline.iterancestors() if a.tag in SECTION_HEADINGS), None)
+        if heading is None:
+            return []
+
+        lines: List[str] = []
+        for sib in heading.itersiblings():
+            if sib.tag in SECTION_HEADINGS:
+                break
+            if sib.tag == "ul":
+                for li in sib.iterchildren("li"):
+                    text = lxml_text(li)
+                    if text:
+                        lines.append(text)
+            elif sib.tag == "p":
+                text = lxml_text(sib)
+                if text:
+                    lines.append(text)
+        return lines
+
+    def extract(self, section_ids: Sequence[str] = SECTION_IDS) -> PageRecord:
+        wanted = set(section_ids)
+        heading = infobox = None
+        headlines = {}
+        for el in self.root.xpath(self.SCAN):
+            el_id = el.get("id")
+            if el_id is not None:
+                if heading is None and el_id == "firstHeading" and el.tag == "h1":
+                    heading = el
+                if el_id in wanted and el_id not in headlines:
+                    headlines[el_id] = el
+            if infobox is None and el.tag == "table" and "va-infobox" in (el.get("class") or "").split():
+                infobox = el
+
+        pairs: List[Tuple[str, Optional[str]]] = []
+        previous: List[str] = []
+        leads_to: List[str] = []
+        if infobox is not None:
+            cells = infobox.xpath(self.INFOBOX_CELLS)
+            flags = [
+                (INFOBOX_LABEL in classes, INFOBOX_CONTENT in classes)
+                for classes in ((c.get("class") or "").split() for c in cells)
+            ]
+            texts = [lxml_text(c) for c in cells]
+            following = pair_infobox_cells(flags)
+            for idx, (cell, (is_label, is_content)) in enumerate(zip(cells, flags)):
+                if is_label:
+                    nxt = following[idx]
+                    if nxt is not None:
+                        pairs.append((texts[idx], texts[nxt]))
+                    else:
+                        content = cell.xpath(self.NEXT_CONTENT)
+                        pairs.append((texts[idx], lxml_text(content[0]) if content else None))
+                if is_content:
+                    kind = related_kind(texts[idx])
+                    if kind:
+                        links = [lxml_text(a) for a in cell.xpath(".//a[@href]")]
+                        (previous if kind == "previous" else leads_to).extend(links)
+
+        return PageRecord(
+            heading=lxml_text(heading) if heading is not None else None,
+            infobox=pairs,
+            previous=previous,
+            leads_to=leads_to,
+            sections={sid: self.section_lines_after(headlines[sid]) if sid in headlines else [] for sid in section_ids},
+        )
+
+
+PARSERS: Dict[str, Callable[[str], object]] = {
+    Bs4Page.name: Bs4Page,
+    LxmlPage.name: LxmlPage,
+}
+
+
+def available_parsers() -> List[str]:
+    return [name for name in PARSERS if name != LxmlPage.name or lxml_html is not None]
+
+
+def parse_page(html: str, parser: str = DEFAULT_PARSER):
+    """
+    Build a quest page with the named backend. Every backend exposes extract() for the single-pass
+    PageRecord, plus heading(), get_infobox(), extract_infobox_value(), extract_related() and
+    extract_section_lines() for looking up one field at a time.
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser {parser!r}; choose from {', '.join(PARSERS)}")
+    return PARSERS[parser](html)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Dict, Iterable, List, Optional
+
+from quest_facets import facet_bitsets
+from quest_rewards import REWARD_GROUPS
+
+# Columnar encoding of the quest graph embedded in index.html (decoded by decodeGraph in the page).
+PAYLOAD_VERSION = 6
+URL_PREFIX = "https://escapefromtarkov.fandom.com/wiki/"
+DETAIL_FIELDS = ["dialogue", "requirements", "objectives"]
+
+
+class StringTable:
+    """
+    Interned strings: each distinct value is stored once and referenced by index (-1 for None).
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+
+def packed_lists(lists: Iterable[Iterable[int]]) -> Dict[str, List[int]]:
+    """
+    Ragged lists as a per-row item count plus one flat array of values.
+    """
+    counts: List[int] = []
+    values: List[int] = []
+    for items in lists:
+        items = list(items)
+        counts.append(len(items))
+        values.extend(items)
+    return {"counts": counts, "values": values}
+
+
+def bitset_b64(bits: int, words: int) -> Optional[str]:
+    """
+    Bitset as base64 of `words` little-endian 32-bit words (None when empty).
+    """
+    if not bits:
+        return None
+    return base64.b64encode(bits.to_bytes(words * 4, "little")).decode("ascii")
+
+
+def short_url(url: Optional[str]) -> Optional[str]:
+    if url and url.startswith(URL_PREFIX):
+        return url[len(URL_PREFIX) :]
+    return url
+
+
+def encode_graph(
+    nodes: List[dict],
+    links: List[dict],
+    reach: dict,
+    layout: Dict[str, List[int]],
+    table: StringTable,
+) -> dict:
+    """
+    Graph section: string table, one column per scalar node field, node-index arrays for previous/leads_to,
+    reward lines, edges, the reachability index and the layout coordinates. The text only the detail card shows goes to
+    encode_details instead. `table` keeps collecting strings (e.g. from encode_search) until serialised.
+    """
+    index = {n["id"]: idx for idx, n in enumerate(nodes)}
+    return {
+        "version": PAYLOAD_VERSION,
+        "url_prefix": URL_PREFIX,
+        "count": len(nodes),
+        "columns": {
+            "name": [table.add(n["name"]) for n in nodes],
+            "location": [table.add(n["location"]) for n in nodes],
+            "given_by": [table.add(n["given_by"]) for n in nodes],
+            "url": [table.add(short_url(n["url"])) for n in nodes],
+            "required_level": [-1 if n["required_level"] is None else n["required_level"] for n in nodes],
+            "level": [n["level"] for n in nodes],
+        },
+        "lists": {
+            "previous": packed_lists([index[name] for name in n["previous"]] for n in nodes),
+            "leads_to": packed_lists([index[name] for name in n["leads_to"]] for n in nodes),
+            "rewards": packed_lists([table.add(line) for line in n["rewards"]] for n in nodes),
+        },
+        "links": {
+            "source": [index[l["source"]] for l in links],
+            "target": [index[l["target"]] for l in links],
+        },
+        "reach": encode_reach(reach),
+        "layout": layout,
+        "rewards": encode_rewards([n["reward"] for n in nodes], table),
+        "facets": encode_facets(nodes, table),
+        "strings": table.strings,
+    }
+
+
+def encode_reach(reach: dict) -> dict:
+    """
+    quest_graph.reachability_index output: packed ancestor/descendant lists, or just the descendant
+    counts for graphs too large to ship the lists.
+    """
+    if "descendant_counts" in reach:
+        return {"descendant_counts": reach["descendant_counts"]}
+    return {key: packed_lists(sets) for key, sets in reach.items()}
+
+
+def encode_rewards(rewards: List[dict], table: StringTable) -> dict:
+    """
+    quest_rewards.parse_rewards output as columns: the group of every reward line (aligned with the
+    reward lines), XP per node (-1 = none), and per-node packed rep/money/items/unlocks with their fields
+    as flat arrays. Names go through the shared string table.
+    """
+    unlocks = [u for r in rewards for u in r["unlocks"]]
+    return {
+        "groups": [REWARD_GROUPS.index(group) for r in rewards for group in r["groups"]],
+        "xp": [-1 if r["xp"] is None else r["xp"] for r in rewards],
+        "rep": packed_lists([table.add(trader) for trader in r["rep"]] for r in rewards),
+        "rep_values": [value for r in rewards for value in r["rep"].values()],
+        "money": packed_lists([table.add(currency) for currency in r["money"]] for r in rewards),
+        "money_values": [amount for r in rewards for amount in r["money"].values()],
+        "items": packed_lists([table.add(item["name"]) for item in r["items"]] for r in rewards),
+        "item_counts": [item["count"] for r in rewards for item in r["items"]],
+        "unlocks": {"counts": [len(r["unlocks"]) for r in rewards]},
+        "unlock_fields": {
+            "kind": [table.add(u["kind"]) for u in unlocks],
+            "item": [table.add(u["item"]) for u in unlocks],
+            "place": [table.add(u["place"]) for u in unlocks],
+            "trader": [table.add(u["trader"]) for u in unlocks],
+            "level": [-1 if u["level"] is None else u["level"] for u in unlocks],
+        },
+    }
+
+
+def encode_facets(nodes: List[dict], table: StringTable) -> dict:
+    """
+    quest_facets.facet_bitsets for the filter panel: per facet the value names and one base64 bitset per
+    value, plus the bitset of quests without a value. All bitsets are `words` 32-bit words long.
+    """
+    words = (len(nodes) + 31) // 32
+    encoded: dict = {"words": words}
+    for facet, bitsets in facet_bitsets(nodes).items():
+        encoded[facet] = {
+            "keys": [table.add(value) for value in bitsets["values"]],
+            "bits": [bitset_b64(bits, words) for bits in bitsets["values"].values()],
+            "unknown": bitset_b64(bitsets["unknown"], words),
+        }
+    return encoded
+
+
+def encode_details(nodes: List[dict]) -> str:
+    """
+    Detail text as one JSON row per node ([dialogue, requirements, objectives], in node order), so the
+    page can parse a single quest's row when it is shown instead of all of them at load.
+    """
+    return "\n".join(json_script([n[field] for field in DETAIL_FIELDS]) for n in nodes)
+
+
+def encode_search(nodes: List[dict], table: StringTable) -> dict:
+    """
+    Inverted index for reward and unlock search: every distinct item name (in order of first appearance)
+    with the quests that give or unlock it, the item count, and the unlock kind and place. Names are ids
+    into the graph section's string table.
+    """
+    items: Dict[str, List[tuple]] = {}
+    unlocks: Dict[str, List[tuple]] = {}
+    for idx, n in enumerate(nodes):
+        for item in n["reward"]["items"]:
+            items.setdefault(item["name"], []).append((idx, item["count"]))
+        for unlock in n["reward"]["unlocks"]:
+            if unlock["kind"]:
+                unlocks.setdefault(unlock["item"], []).append((idx, unlock["kind"], unlock["place"]))
+
+    return {
+        "reward": {
+            "keys": [table.add(name) for name in items],
+            "hits": packed_lists([idx for idx, _ in hits] for hits in items.values()),
+            "amounts": [count for hits in items.values() for _, count in hits],
+        },
+        "unlock": {
+            "keys": [table.add(name) for name in unlocks],
+            "hits": packed_lists([idx for idx, _, _ in hits] for hits in unlocks.values()),
+            "kinds": [table.add(kind) for hits in unlocks.values() for _, kind, _ in hits],
+            "places": [table.add(place) for hits in unlocks.values() for _, _, place in hits],
+        },
+    }
+
+
+def json_script(data) -> str:
+    """
+    Compact JSON that is safe inside a <script> data block (no "</" can close the element early).
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional
+
+# Reward lines as scraped from the wiki, e.g. "+5,900 EXP", "Jaeger Rep +0.02", "2× Physical Bitcoin",
+# "50,000 Roubles 52,500 Roubles with Intelligence Center Level 1 ..." or
+# "Unlocks purchase of Kalashnikov AKS-74UB 5.45x39 assault rifle at Prapor LL1".
+REWARD_GROUPS = ["xp", "rep", "money", "items", "unlocks", "other"]
+
+# Grouping rules, tried in this order (same precedence the detail card has always used).
+UNLOCK_LINE_RE = re.compile(r"^Unlocks\b", re.IGNORECASE)
+XP_LINE_RE = re.compile(r"\bexp\b", re.IGNORECASE)
+REP_LINE_RE = re.compile(r"\bRep\b", re.IGNORECASE)
+REP_FALLBACK_RE = re.compile(r"^[A-Za-z][A-Za-z\s-]+\s*[+-][0-9]")
+MONEY_LINE_RE = re.compile(r"\b(Roubles|Rubles|Dollars|Euros)\b", re.IGNORECASE)
+ITEM_LINE_RE = re.compile(r"^[0-9]+\s*[x×]\s*", re.IGNORECASE)
+ITEM_COUNT_RE = re.compile(r"^[0-9][0-9,]*\s+\S+")
+
+# Field extraction within a group.
+XP_RE = re.compile(r"([0-9][0-9,]*)\s*EXP", re.IGNORECASE)
+REP_RE = re.compile(r"^(.+?)\s+(?:Rep\s+)?([+-][0-9]*\.?[0-9]+)", re.IGNORECASE)
+MONEY_RE = re.compile(r"([0-9][0-9,]*)\s*(Roubles|Rubles|Dollars|Euros)\b", re.IGNORECASE)
+ITEM_RE = re.compile(r"^([0-9][0-9,]*)\s*(?:[x×]\s*)?(.+)$", re.IGNORECASE)
+# "52 GP coins 55 GP coins with Intelligence Center Level 1 ...": the base amount comes first.
+BONUS_RE = re.compile(r"\s+[0-9][0-9,]*\s+\D.*?\bwith Intelligence Center\b.*$", re.IGNORECASE)
+UNLOCK_RE = re.compile(r"^Unlocks\s+(purchase|barter|craft)\s+(?:for\s+|of\s+)?(.+?)(?:\s+at\s+(.+))?$", re.IGNORECASE)
+LOYALTY_RE = re.compile(r"^(.+?)\s+LL\s*([0-9]+)$")
+STATION_RE = re.compile(r"^(.+?)\s+level\s+([0-9]+)$", re.IGNORECASE)
+CURRENCIES = {"roubles": "Roubles", "rubles": "Roubles", "dollars": "Dollars", "euros": "Euros"}
+
+
+def reward_group(line: str) -> str:
+    if UNLOCK_LINE_RE.search(line):
+        return "unlocks"
+    if XP_LINE_RE.search(line):
+        return "xp"
+    if REP_LINE_RE.search(line) or REP_FALLBACK_RE.search(line):
+        return "rep"
+    if MONEY_LINE_RE.search(line):
+        return "money"
+    if ITEM_LINE_RE.search(line) or ITEM_COUNT_RE.search(line):
+        return "items"
+    return "other"
+
+
+def to_int(digits: str) -> int:
+    return int(digits.replace(",", ""))
+
+
+def parse_unlock(line: str) -> dict:
+    """
+    {"kind", "item", "place", "trader", "level"} for an "Unlocks ..." line. kind is purchase/barter/craft
+    or None (achievements, hideout styles, traders); trader and level come from "at Prapor LL2", level
+    alone from "at Workbench level 3".
+    """
+    unlock = {"kind": None, "item": line[len("Unlocks ") :].strip(), "place": None, "trader": None, "level": None}
+    match = UNLOCK_RE.match(line)
+    if not match or not match.group(2):
+        return unlock
+    unlock["kind"] = match.group(1).lower()
+    unlock["item"] = match.group(2).strip()
+    place = (match.group(3) or "").strip() or None
+    unlock["place"] = place
+    if place:
+        loyalty = LOYALTY_RE.match(place)
+        station = STATION_RE.match(place)
+        if loyalty:
+            unlock["trader"], unlock["level"] = loyalty.group(1), int(loyalty.group(2))
+        elif station:
+            unlock["level"] = int(station.group(2))
+    return unlock
+
+
+def parse_rewards(lines: List[str]) -> dict:
+    """
+    Structured view of a quest's reward lines: the display group of every line, XP (first EXP amount),
+    reputation per trader, money per currency, items with counts and unlocks.
+    """
+    xp: Optional[int] = None
+    rep: Dict[str, float] = {}
+    money: Dict[str, int] = {}
+    items: List[dict] = []
+    unlocks: List[dict] = []
+    groups: List[str] = []
+    for line in lines:
+        group = reward_group(line)
+        groups.append(group)
+        if xp is None:
+            match = XP_RE.search(line)
+            if match:
+                xp = to_int(match.group(1))
+        if group == "rep":
+            match = REP_RE.match(line)
+            if match:
+                trader = match.group(1).strip()
+                rep[trader] = round(rep.get(trader, 0.0) + float(match.group(2)), 4)
+        elif group == "money":
+            match = MONEY_RE.search(line)
+            if match:
+                currency = CURRENCIES[match.group(2).lower()]
+                money[currency] = money.get(currency, 0) + to_int(match.group(1))
+        elif group == "items":
+            match = ITEM_RE.match(BONUS_RE.sub("", line))
+            if match:
+                items.append({"name": match.group(2).strip(), "count": to_int(match.group(1))})
+        elif group == "unlocks":
+            unlocks.append(parse_unlock(line))
+    return {"xp": xp, "rep": rep, "money": money, "items": items, "unlocks": unlocks, "groups": groups}
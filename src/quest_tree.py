@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
-import re
-from typing import Dict, List
+from typing import Dict
 from urllib.parse import quote
 
+import numpy as np
 import pandas as pd
 
+from quest_graph import DEFAULT_LAYERING, LAYERINGS, assign_levels, find_cycles, reachability_index
+from quest_layout import layered_layout
+from quest_payload import StringTable, encode_details, encode_graph, encode_search, json_script
+from quest_rewards import parse_rewards
+
 
 HTML_TEMPLATE = """<!doctype html>
 <html lang="en">
@@ -98,6 +104,7 @@ HTML_TEMPLATE = """<!doctype html>
       flex-direction: column;
       gap: 6px;
       pointer-events: none;
+      z-index: 2;
     }
     #trader-legend .legend-grid {
       display: flex;
@@ -120,6 +127,31 @@ HTML_TEMPLATE = """<!doctype html>
     #open-link { padding: 10px 12px; border: 1px solid var(--accent); background: rgba(59,130,246,0.15); color: #bfdbfe; border-radius: 8px; cursor: pointer; font-weight: 600; margin-top: 4px; align-self: flex-start; display: inline-flex; text-decoration: none; }
     #open-link.is-disabled { opacity: 0.4; cursor: not-allowed; border-color: var(--stroke); pointer-events: none; }
     svg { width: 100%; height: 100%; background: transparent; }
+    #chart canvas { position: absolute; inset: 0; width: 100%; height: 100%; display: none; }
+    #chart.canvas-mode svg { display: none; }
+    #chart.canvas-mode canvas { display: block; }
+    #chart svg.lod-labels .node text { display: none; }
+    #chart svg.lod-glyphs .node circle.available-ring,
+    #chart svg.lod-glyphs .node circle.important-ring,
+    #chart svg.lod-glyphs .node circle.status-ring { display: none; }
+    #chart svg.lod-glyphs .node circle.core { filter: none; }
+    #render-toggle {
+      position: absolute;
+      top: 12px;
+      right: 12px;
+      z-index: 2;
+      width: 36px;
+      height: 36px;
+      border-radius: 8px;
+      border: 1px solid var(--stroke);
+      background: #0b1223;
+      color: var(--text);
+      cursor: pointer;
+      display: inline-flex;
+      align-items: center;
+      justify-content: center;
+    }
+    #render-toggle.is-active { border-color: var(--accent); color: #bfdbfe; }
     .node { cursor: pointer; }
     .node circle.core { stroke: var(--stroke); stroke-width: 1.5; }
     .node circle.status-ring { fill: none; stroke-width: 4; opacity: 0; }
@@ -355,6 +387,9 @@ HTML_TEMPLATE = """<!doctype html>
     <div id="trader-legend">
       <div class="legend-grid"></div>
     </div>
+    <button id="render-toggle" aria-label="Canvas rendering" title="Draw the graph on a canvas">
+      <span class="material-symbols-outlined" aria-hidden="true">brush</span>
+    </button>
   </div>
   <div id="panel">
     <div id="progress-toolbar">
@@ -445,14 +480,196 @@ HTML_TEMPLATE = """<!doctype html>
     <a href="https://github.com/denecity/tarkov-tree" target="_blank" rel="noopener noreferrer">github.com/denecity/tarkov-tree</a>
   </div>
 
+  <script type="application/json" id="quest-graph">__GRAPH__</script>
+  <script type="text/plain" id="quest-details">__DETAILS__</script>
+  <script type="application/json" id="quest-search">__SEARCH__</script>
   <script>
-    // Raw data
-    const nodes = __NODES__;
-    const links = __LINKS__.map(l => ({ source: l.source, target: l.target }));
+    // Columnar payload written by quest_payload.py; see decodeGraph for the layout.
+    function readPayload(id) {
+      return JSON.parse(document.getElementById(id).textContent);
+    }
+
+    // {counts, values} -> one Int32Array view per row
+    function unpackLists(packed) {
+      const values = Int32Array.from(packed.values);
+      const rows = new Array(packed.counts.length);
+      let offset = 0;
+      packed.counts.forEach((count, i) => {
+        rows[i] = values.subarray(offset, offset + count);
+        offset += count;
+      });
+      return rows;
+    }
+
+    // Structured rewards parsed by quest_rewards.py: {xp, rep, money, items, unlocks, groups} per node.
+    function decodeRewards(cols, strings, lines) {
+      const GROUPS = ["xp", "rep", "money", "items", "unlocks", "other"];
+      const str = i => (i < 0 ? null : strings[i]);
+      const rep = unpackLists(cols.rep);
+      const money = unpackLists(cols.money);
+      const items = unpackLists(cols.items);
+      const fields = cols.unlock_fields;
+      let line = 0;
+      let repAt = 0;
+      let moneyAt = 0;
+      let itemAt = 0;
+      let unlockAt = 0;
+      return cols.xp.map((xp, i) => {
+        const reward = {
+          xp: xp < 0 ? null : xp,
+          rep: {},
+          money: {},
+          items: [],
+          unlocks: [],
+          groups: Array.from(lines[i], () => GROUPS[cols.groups[line++]]),
+        };
+        rep[i].forEach(k => { reward.rep[strings[k]] = cols.rep_values[repAt++]; });
+        money[i].forEach(k => { reward.money[strings[k]] = cols.money_values[moneyAt++]; });
+        items[i].forEach(k => reward.items.push({ name: strings[k], count: cols.item_counts[itemAt++] }));
+        for (let u = 0; u < cols.unlocks.counts[i]; u++, unlockAt++) {
+          reward.unlocks.push({
+            kind: str(fields.kind[unlockAt]),
+            item: str(fields.item[unlockAt]),
+            place: str(fields.place[unlockAt]),
+            trader: str(fields.trader[unlockAt]),
+            level: fields.level[unlockAt] < 0 ? null : fields.level[unlockAt],
+          });
+        }
+        return reward;
+      });
+    }
+
+    // Node sets as bitsets: Uint32Array, bit i set when nodes[i] is in the set.
+    function decodeBitset(b64, words) {
+      const bits = new Uint32Array(words);
+      if (!b64) return bits;
+      const bytes = atob(b64);
+      for (let i = 0; i < bytes.length; i++) bits[i >> 2] |= bytes.charCodeAt(i) << ((i & 3) * 8);
+      return bits;
+    }
+
+    function hasBit(bits, i) {
+      return (bits[i >> 5] & (1 << (i & 31))) !== 0;
+    }
+
+    function popcount(word) {
+      word -= (word >>> 1) & 0x55555555;
+      word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+      return (((word + (word >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+    }
+
+    // Size of a & b without building the intersection (null stands for every node).
+    function countAnd(a, b) {
+      if (!a) [a, b] = [b, null];
+      if (!a) return nodes.length;
+      let total = 0;
+      for (let w = 0; w < a.length; w++) total += popcount(b ? a[w] & b[w] : a[w]);
+      return total;
+    }
+
+    // Filter facets built by quest_facets.py: {keys, values: Map(value -> bitset), unknown} per facet.
+    function decodeFacets(raw, strings) {
+      const facets = { words: raw.words };
+      ["trader", "location", "unlock"].forEach((facet) => {
+        const keys = raw[facet].keys.map(k => strings[k]);
+        facets[facet] = {
+          keys,
+          values: new Map(keys.map((key, i) => [key, decodeBitset(raw[facet].bits[i], raw.words)])),
+          unknown: raw[facet].unknown ? decodeBitset(raw[facet].unknown, raw.words) : null,
+        };
+      });
+      return facets;
+    }
+
+    // Transitive closure (quest_graph.reachability_index): ancestors(i)/descendants(i) give the indices of
+    // every quest before/after quest i. Large graphs ship only the descendant counts; the sets are then
+    // walked from the links when a quest is selected.
+    function decodeReach(raw, links) {
+      if (raw.ancestors) {
+        const ancestors = unpackLists(raw.ancestors);
+        const descendants = unpackLists(raw.descendants);
+        return { ancestors: i => ancestors[i], descendants: i => descendants[i], descendantCounts: raw.descendants.counts };
+      }
+      const parents = raw.descendant_counts.map(() => []);
+      const children = raw.descendant_counts.map(() => []);
+      links.source.forEach((s, k) => {
+        children[s].push(links.target[k]);
+        parents[links.target[k]].push(s);
+      });
+      const walk = lists => (start) => {
+        const seen = new Uint8Array(lists.length);
+        const found = [];
+        const stack = [start];
+        seen[start] = 1;
+        while (stack.length) {
+          for (const next of lists[stack.pop()]) {
+            if (seen[next]) continue;
+            seen[next] = 1;
+            found.push(next);
+            stack.push(next);
+          }
+        }
+        return found;
+      };
+      return { ancestors: walk(parents), descendants: walk(children), descendantCounts: raw.descendant_counts };
+    }
+
+    function decodeGraph(graph) {
+      const strings = graph.strings;
+      const str = i => (i < 0 ? null : strings[i]);
+      const cols = graph.columns;
+      const previous = unpackLists(graph.lists.previous);
+      const leadsTo = unpackLists(graph.lists.leads_to);
+      const rewards = unpackLists(graph.lists.rewards);
+      const rewardInfo = decodeRewards(graph.rewards, strings, rewards);
+
+      const nodes = new Array(graph.count);
+      for (let i = 0; i < graph.count; i++) {
+        const name = strings[cols.name[i]];
+        const url = str(cols.url[i]);
+        nodes[i] = {
+          id: name,
+          name,
+          location: str(cols.location[i]),
+          given_by: str(cols.given_by[i]),
+          url: url && !url.startsWith("http") ? graph.url_prefix + url : url,
+          required_level: cols.required_level[i] < 0 ? null : cols.required_level[i],
+          rewards: Array.from(rewards[i], k => strings[k]),
+          reward: rewardInfo[i],
+          previous: [],
+          leads_to: [],
+          level: cols.level[i],
+          // Precomputed layered layout (quest_layout.py); y is relative to the middle of the chart.
+          x: graph.layout.x[i],
+          y: graph.layout.y[i],
+        };
+      }
+      nodes.forEach((n, i) => {
+        n.previous = Array.from(previous[i], k => nodes[k].id);
+        n.leads_to = Array.from(leadsTo[i], k => nodes[k].id);
+      });
+      const links = graph.links.source.map((s, k) => ({ source: nodes[s].id, target: nodes[graph.links.target[k]].id }));
+      const reach = decodeReach(graph.reach, graph.links);
+      return { nodes, links, reach, strings, facets: decodeFacets(graph.facets, strings) };
+    }
+
+    const { nodes, links, reach, strings, facets } = decodeGraph(readPayload("quest-graph"));
     const nodesById = new Map(nodes.map(n => [n.id, n]));
+    const nodeIndexById = new Map(nodes.map((n, i) => [n.id, i]));
+
+    // Dialogue/requirements/objectives stay an unparsed blob (one JSON row per quest, in node order)
+    // until a quest's card is shown; only that quest's row is decoded.
+    let detailRows = null;
+    function questDetails(n) {
+      if (!detailRows) detailRows = document.getElementById("quest-details").textContent.split("\\n");
+      const row = detailRows[nodeIndexById.get(n.id)];
+      const [dialogue, requirements, objectives] = row ? JSON.parse(row) : [[], [], []];
+      return { dialogue, requirements, objectives };
+    }
     const STORAGE_KEY = "tarkov-quest-progress";
     const PROGRESS_ENABLED_KEY = "tarkov-quest-progress-enabled";
     const IMPORTANT_KEY = "tarkov-quest-important";
+    const LAYOUT_KEY = "tarkov-quest-layout";
     const STATUS_LABELS = {
       none: "Not completed",
       completed: "Completed"
@@ -521,6 +738,57 @@ HTML_TEMPLATE = """<!doctype html>
       }
     }
 
+    // FNV-1a over the embedded graph payload: saved positions are only reused for the same graph.
+    function hashText(text) {
+      let hash = 0x811c9dc5;
+      for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+      }
+      return (hash >>> 0).toString(16);
+    }
+
+    const graphHash = hashText(document.getElementById("quest-graph").textContent);
+
+    // mulberry32, seeded from the graph hash, for the simulation's jiggle so drags replay the same way.
+    function seededRandom(seed) {
+      let state = seed >>> 0;
+      return () => {
+        state = (state + 0x6d2b79f5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+      };
+    }
+
+    // Positions the simulation settled on after a drag, as {hash, x, y} (y relative to the chart middle).
+    function loadLayout() {
+      try {
+        const raw = localStorage.getItem(LAYOUT_KEY);
+        if (!raw) return null;
+        const parsed = JSON.parse(raw);
+        if (!parsed || parsed.hash !== graphHash) return null;
+        if (!Array.isArray(parsed.x) || !Array.isArray(parsed.y)) return null;
+        if (parsed.x.length !== nodes.length || parsed.y.length !== nodes.length) return null;
+        return parsed;
+      } catch (_) {
+        return null;
+      }
+    }
+
+    function saveLayout() {
+      try {
+        localStorage.setItem(LAYOUT_KEY, JSON.stringify({
+          hash: graphHash,
+          x: nodes.map(n => Math.round(n.x)),
+          y: nodes.map(n => Math.round(n.y - height / 2)),
+        }));
+      } catch (_) {
+        // Ignore storage failures (private mode, quota).
+      }
+    }
+
     function isImportant(id) {
       return importantSet.has(id);
     }
@@ -558,6 +826,18 @@ HTML_TEMPLATE = """<!doctype html>
     let importantSet = loadImportant();
     let availableSet = new Set();
 
+    // Progress engine: completedParents[i] counts the completed quests leading to quest i, and a quest is
+    // available when it is not completed itself but that count is above zero. Completing or reopening a
+    // quest only adjusts the counters of the quests it leads to.
+    const childIndices = nodes.map(() => []);
+    links.forEach(l => {
+      const src = nodeIndexById.get(l.source.id ? l.source.id : l.source);
+      const tgt = nodeIndexById.get(l.target.id ? l.target.id : l.target);
+      childIndices[src].push(tgt);
+    });
+    const completedFlags = new Uint8Array(nodes.length);
+    const completedParents = new Int32Array(nodes.length);
+
     function statusFor(id) {
       return progressMap.get(id) || "none";
     }
@@ -566,16 +846,8 @@ HTML_TEMPLATE = """<!doctype html>
       return STATUS_COLORS[status] || "transparent";
     }
 
-    const XP_RE = /\\bexp\\b/i;
-    const REP_RE = /\\bRep\\b/i;
-    const REP_FALLBACK_RE = /^[A-Za-z][A-Za-z\\s-]+\\s*[+-]\\d/;
-    const MONEY_RE = /\\b(Roubles|Rubles|Dollars|Euros)\\b/i;
-    const UNLOCK_RE = /^Unlocks\\b/i;
-    const ITEM_RE = /^\\d+\\s*[x\\u00d7]\\s*/i;
-    const ITEM_COUNT_RE = /^\\d[\\d,]*\\s+\\S+/;
-
-    function rewardHasUnlocks(rewards) {
-      return (rewards || []).some(reward => UNLOCK_RE.test(reward || ""));
+    function hasUnlocks(n) {
+      return n.reward.unlocks.length > 0;
     }
 
     function isAvailable(id) {
@@ -596,21 +868,50 @@ HTML_TEMPLATE = """<!doctype html>
     const height = window.innerHeight;
     const width = Math.max(window.innerWidth * 0.65, margin * 2 + columnGap * 8);
 
-    // Initial positions based on level, random y to spread vertically
     function lockableRoot(n) {
       return (n.level || 0) === 0 && n.leads_to && n.leads_to.length > 0;
     }
 
-    nodes.forEach(n => {
-      n.x = margin + (n.level || 0) * columnGap + (Math.random() - 0.5) * 20;
-      n.y = margin + (Math.random() * (height - 2 * margin));
-      if (lockableRoot(n)) {
-        n.fx = margin; // lock x for root nodes that lead somewhere
+    // Start from the layout saved after the last drag, or else the precomputed one; the simulation
+    // below only runs while a quest is dragged.
+    const savedLayout = loadLayout();
+    nodes.forEach((n, i) => {
+      if (savedLayout) {
+        n.x = savedLayout.x[i];
+        n.y = savedLayout.y[i];
       }
+      n.y += height / 2;
+    });
+    // The simulation runs off this thread, so link ends are resolved to nodes here (d3.forceLink used to).
+    links.forEach(l => {
+      l.source = nodesById.get(l.source);
+      l.target = nodesById.get(l.target);
     });
 
-    const zoom = d3.zoom().scaleExtent([0.3, 3]).on("zoom", (event) => {
-      g.attr("transform", event.transform);
+    // Canvas renderer state (see the canvas renderer below); declared early because the SVG setup
+    // already triggers re-renders.
+    let canvasMode = false;
+    let renderRequested = false;
+    let quadtree = null;
+    let linkTree = null;
+    let highlightSets = { ancestors: new Set(), descendants: new Set() };
+
+    // Level of detail: below LABEL_ZOOM labels and badges are hidden, below GLYPH_ZOOM quests are drawn
+    // as plain circles (no rings or glows). Off-screen quests and links are skipped either way.
+    const LABEL_ZOOM = 0.6;
+    const GLYPH_ZOOM = 0.4;
+    const CULL_MARGIN = 250; // graph units; labels extend to the right of their node
+
+    const zoom = d3.zoom().scaleExtent([0.3, 3]).on("zoom", function (event) {
+      if (this === canvasEl) {
+        requestRender();
+      } else {
+        g.attr("transform", event.transform);
+        svg
+          .classed("lod-labels", event.transform.k < LABEL_ZOOM)
+          .classed("lod-glyphs", event.transform.k < GLYPH_ZOOM);
+        requestCull();
+      }
     });
     const svg = d3.select("#chart")
       .append("svg")
@@ -632,7 +933,7 @@ HTML_TEMPLATE = """<!doctype html>
       .data(nodes)
       .join("g")
       .attr("class", "node")
-      .classed("has-unlocks", d => rewardHasUnlocks(d.rewards))
+      .classed("has-unlocks", hasUnlocks)
       .call(d3.drag()
         .on("start", dragstarted)
         .on("drag", dragged)
@@ -665,7 +966,7 @@ HTML_TEMPLATE = """<!doctype html>
       .attr("y", -8)
       .attr("text-anchor", "middle")
       .attr("dominant-baseline", "middle")
-      .attr("opacity", d => rewardHasUnlocks(d.rewards) ? 1 : 0)
+      .attr("opacity", d => hasUnlocks(d) ? 1 : 0)
       .text("+");
 
     node.append("text")
@@ -679,19 +980,12 @@ HTML_TEMPLATE = """<!doctype html>
       .attr("y", 4)
       .text(d => d.name);
 
-    const childrenForCounts = buildChildren();
-    const dependentsById = new Map();
-    nodes.forEach(n => {
-      const desc = collectDescendants(n.id, childrenForCounts, new Set());
-      dependentsById.set(n.id, Math.max(0, desc.size - 1));
-    });
-
     node.append("text")
       .attr("class", "dependents-badge")
       .attr("x", 6)
       .attr("y", 14)
       .attr("text-anchor", "start")
-      .text(d => dependentsById.get(d.id) || "");
+      .text(d => reach.descendantCounts[nodeIndexById.get(d.id)] || "");
 
     node.on("click", (_, d) => {
       selectNode(d);
@@ -700,108 +994,268 @@ HTML_TEMPLATE = """<!doctype html>
     applyProgressToNodes();
     applyImportantToNodes();
 
-    // Custom force to encourage targets to sit to the right of their sources
-    function forceRightBias(strength = 0.1, gap = 80) {
-      return (alpha) => {
-        links.forEach(l => {
-          const s = typeof l.source === "object" ? l.source : nodesById.get(l.source);
-          const t = typeof l.target === "object" ? l.target : nodesById.get(l.target);
-          if (!s || !t) return;
-          const desired = s.x + gap;
-          const delta = desired - t.x;
-          t.vx += delta * strength * alpha;
-        });
+    // Force simulation for drags. Self-contained (no closure over page state) so its source can be
+    // shipped to a Web Worker: takes the d3 namespace, the layout inputs from layoutInit and a
+    // post(message, transfer) callback, and returns the handler for control messages.
+    // Ticks run in batches, as many as fit in init.frameBudget ms (at least one), and each batch posts the
+    // positions once as a transferable Float32Array [x0, y0, x1, y1, ...]. A run stops when the layout
+    // settles or after init.maxTicks ticks without a drag in progress, so settling stays bounded on
+    // large graphs.
+    function runForceLayout(d3, init, post) {
+      const SETTLE_ALPHA = 0.02;
+      const SETTLE_VELOCITY = 0.03;
+      const SETTLE_TICKS = 24;
+      const count = init.x.length;
+      const source = Int32Array.from(init.source);
+      const target = Int32Array.from(init.target);
+      const nodes = Array.from({ length: count }, (_, i) => ({
+        x: init.x[i],
+        y: init.y[i],
+        fx: Number.isNaN(init.fx[i]) ? null : init.fx[i],
+        fy: null,
+        level: init.level[i],
+        homeY: init.y[i],
+      }));
+      const links = Array.from(source, (s, k) => ({ source: s, target: target[k] }));
+      const now = () => (typeof performance !== "undefined" ? performance.now() : Date.now());
+      const nextFrame = typeof requestAnimationFrame === "function" ? requestAnimationFrame : fn => setTimeout(fn, 16);
+
+      // Custom force to encourage targets to sit to the right of their sources
+      function forceRightBias(strength = 0.1, gap = 80) {
+        return (alpha) => {
+          const scale = strength * alpha;
+          for (let k = 0; k < source.length; k++) {
+            const t = nodes[target[k]];
+            t.vx += (nodes[source[k]].x + gap - t.x) * scale;
+          }
+        };
+      }
+
+      let settleCount = 0;
+      let ticks = 0;
+      let running = false;
+      let dragging = false;
+      let coolTimer = null;
+
+      const simulation = d3.forceSimulation(nodes)
+        .force("link", d3.forceLink(links).distance(140).strength(0.7))
+        .force("charge", d3.forceManyBody().strength(-150))
+        .force("collide", d3.forceCollide(18))
+        .force("x", d3.forceX(d => init.margin + d.level * init.columnGap).strength(d => d.level === 0 ? 1 : 0.6))
+        .force("y", d3.forceY(d => d.homeY).strength(0.02))
+        .force("rightBias", forceRightBias(0.22, 90))
+        .velocityDecay(0.42)
+        .alpha(0)
+        .stop();
+      if (simulation.randomSource) simulation.randomSource(seededRandom(init.seed));
+
+      // One pass over the nodes per batch: copies the positions out and measures the largest velocity.
+      function postPositions() {
+        const positions = new Float32Array(count * 2);
+        let maxV = 0;
+        for (let i = 0; i < count; i++) {
+          const n = nodes[i];
+          positions[2 * i] = n.x;
+          positions[2 * i + 1] = n.y;
+          const v = Math.abs(n.vx || 0) + Math.abs(n.vy || 0);
+          if (v > maxV) maxV = v;
+        }
+        post({ type: "tick", positions }, [positions.buffer]);
+        return maxV;
+      }
+
+      function frame() {
+        if (!running) return;
+        const began = now();
+        let batch = 0;
+        do {
+          simulation.tick();
+          batch += 1;
+        } while (now() - began < init.frameBudget && ticks + batch < init.maxTicks);
+        ticks += batch;
+        const maxV = postPositions();
+
+        if (dragging || simulation.alpha() > SETTLE_ALPHA || maxV >= SETTLE_VELOCITY) {
+          settleCount = 0;
+        } else {
+          settleCount += batch;
+        }
+        if (!dragging && (settleCount >= SETTLE_TICKS || ticks >= init.maxTicks)) {
+          running = false;
+          simulation.alphaTarget(0);
+          post({ type: "settled" });
+          return;
+        }
+        nextFrame(frame);
+      }
+
+      function start() {
+        settleCount = 0;
+        ticks = 0;
+        if (!running) {
+          running = true;
+          nextFrame(frame);
+        }
+      }
+
+      return (msg) => {
+        if (msg.type === "warmup") {
+          simulation.alpha(Math.max(simulation.alpha(), msg.alpha)).alphaTarget(msg.target);
+          start();
+          if (coolTimer) clearTimeout(coolTimer);
+          coolTimer = setTimeout(() => simulation.alphaTarget(0), msg.duration);
+        } else if (msg.type === "cool") {
+          simulation.alphaTarget(0);
+        } else if (msg.type === "fix") {
+          nodes[msg.index].fx = msg.fx;
+          nodes[msg.index].fy = msg.fy;
+        } else if (msg.type === "dragging") {
+          dragging = msg.active;
+          // The tick cap counts from the end of the drag, not from its start.
+          if (!dragging) ticks = 0;
+        }
       };
     }
 
-    const simulation = d3.forceSimulation(nodes)
-      .force("link", d3.forceLink(links).id(d => d.id).distance(140).strength(0.7))
-      .force("charge", d3.forceManyBody().strength(-150))
-      .force("collide", d3.forceCollide(18))
-      .force("x", d3.forceX(d => margin + (d.level || 0) * columnGap).strength(d => (d.level || 0) === 0 ? 1 : 0.6))
-      .force("y", d3.forceY(height / 2).strength(0.02))
-      .force("rightBias", forceRightBias(0.22, 90))
-      .velocityDecay(0.42)
-      .alpha(1)
-      .on("tick", ticked);
-
-    const SETTLE_ALPHA = 0.02;
-    const SETTLE_VELOCITY = 0.03;
-    const SETTLE_TICKS = 24;
+    // Batch length per animation frame and the tick cap for one run of the drag simulation.
+    const LAYOUT_FRAME_BUDGET_MS = 8;
+    const LAYOUT_MAX_TICKS = 600;
+
+    const D3_URL = "https://cdn.jsdelivr.net/npm/d3@7";
+
+    function layoutWorkerSource() {
+      return [
+        `importScripts(${JSON.stringify(D3_URL)});`,
+        seededRandom.toString(),
+        runForceLayout.toString(),
+        "let handle = null;",
+        "self.onmessage = (e) => {",
+        "  if (e.data.type === 'init') {",
+        "    handle = runForceLayout(self.d3, e.data, (msg, transfer) => self.postMessage(msg, transfer || []));",
+        "  } else if (handle) {",
+        "    handle(e.data);",
+        "  }",
+        "};",
+      ].join("\\n");
+    }
+
+    // Current positions plus everything runForceLayout needs, as plain arrays the worker can receive.
+    function layoutInit() {
+      return {
+        type: "init",
+        x: Float64Array.from(nodes, n => n.x),
+        y: Float64Array.from(nodes, n => n.y),
+        fx: Float64Array.from(nodes, n => lockableRoot(n) ? margin : NaN), // roots that lead somewhere stay left
+        level: Int32Array.from(nodes, n => n.level || 0),
+        source: Int32Array.from(links, l => nodeIndexById.get(l.source.id)),
+        target: Int32Array.from(links, l => nodeIndexById.get(l.target.id)),
+        margin,
+        columnGap,
+        seed: parseInt(graphHash, 16),
+        frameBudget: LAYOUT_FRAME_BUDGET_MS,
+        maxTicks: LAYOUT_MAX_TICKS,
+      };
+    }
+
+    // Runs the simulation in a Web Worker, or on this thread if workers (or loading d3 in one) fail.
+    // Returns the function that sends control messages to it.
+    function startLayoutEngine(receive) {
+      let send = null;
+      const runHere = () => {
+        send = runForceLayout(d3, layoutInit(), receive);
+      };
+      try {
+        const url = URL.createObjectURL(new Blob([layoutWorkerSource()], { type: "text/javascript" }));
+        const worker = new Worker(url);
+        worker.onmessage = (e) => receive(e.data);
+        worker.onerror = (e) => {
+          if (e && e.preventDefault) e.preventDefault();
+          worker.terminate();
+          runHere();
+        };
+        const init = layoutInit();
+        worker.postMessage(init, [init.x.buffer, init.y.buffer, init.fx.buffer, init.level.buffer]);
+        send = msg => worker.postMessage(msg);
+      } catch (_) {
+        runHere();
+      }
+      return msg => send(msg);
+    }
+
     const WARMUP_ALPHA = 0.22;
     const WARMUP_TARGET = 0.12;
     const WARMUP_DURATION = 12000;
     const DRAG_THRESHOLD = 4;
-    let settleCount = 0;
-    let isSettled = false;
     let dragCount = 0;
     let dragStart = null;
     let dragMoved = false;
 
-    let coolTimer = null;
-    function warmup(alpha = WARMUP_ALPHA, target = WARMUP_TARGET, duration = WARMUP_DURATION) {
-      isSettled = false;
-      settleCount = 0;
-      simulation.alpha(Math.max(simulation.alpha(), alpha)).alphaTarget(target).restart();
-      if (coolTimer) clearTimeout(coolTimer);
-      coolTimer = setTimeout(() => simulation.alphaTarget(0), duration);
+    // Latest positions from the simulation; applied at most once per animation frame.
+    let pendingPositions = null;
+    let frameRequested = false;
+
+    function applyPositions() {
+      if (!pendingPositions) return;
+      const positions = pendingPositions;
+      pendingPositions = null;
+      nodes.forEach((n, i) => {
+        n.x = positions[2 * i];
+        n.y = positions[2 * i + 1];
+      });
+      ticked();
+    }
+
+    function receiveLayout(msg) {
+      if (msg.type === "tick") {
+        pendingPositions = msg.positions;
+        if (!frameRequested) {
+          frameRequested = true;
+          requestAnimationFrame(() => {
+            frameRequested = false;
+            applyPositions();
+          });
+        }
+      } else if (msg.type === "settled") {
+        applyPositions();
+        saveLayout();
+      }
     }
 
-    function maxVelocity() {
-      let max = 0;
-      nodes.forEach(n => {
-        const vx = Math.abs(n.vx || 0);
-        const vy = Math.abs(n.vy || 0);
-        const v = vx + vy;
-        if (v > max) max = v;
-      });
-      return max;
+    const sendLayout = startLayoutEngine(receiveLayout);
+
+    function warmup(alpha = WARMUP_ALPHA, target = WARMUP_TARGET, duration = WARMUP_DURATION) {
+      sendLayout({ type: "warmup", alpha, target, duration });
     }
 
-    function checkSettled() {
-      if (dragCount > 0) {
-        settleCount = 0;
-        isSettled = false;
-        return;
-      }
-      if (simulation.alpha() > SETTLE_ALPHA) {
-        settleCount = 0;
-        isSettled = false;
-        return;
-      }
-      const maxV = maxVelocity();
-      if (maxV < SETTLE_VELOCITY) {
-        settleCount += 1;
-        if (settleCount >= SETTLE_TICKS && !isSettled) {
-          isSettled = true;
-          simulation.alphaTarget(0);
-          simulation.stop();
-        }
-      } else {
-        settleCount = 0;
-        isSettled = false;
-      }
+    function fixNode(n, fx, fy) {
+      n.fx = fx;
+      n.fy = fy;
+      sendLayout({ type: "fix", index: nodeIndexById.get(n.id), fx, fy });
     }
 
     function ticked() {
+      quadtree = null;
+      linkTree = null;
+      if (canvasMode) {
+        requestRender();
+        return;
+      }
       link
         .attr("x1", d => d.source.x)
         .attr("y1", d => d.source.y)
         .attr("x2", d => d.target.x)
         .attr("y2", d => d.target.y);
       node.attr("transform", d => `translate(${d.x},${d.y})`);
-      checkSettled();
+      requestCull();
     }
 
     function dragstarted(event) {
       dragStart = { x: event.x, y: event.y };
       dragMoved = false;
       if (lockableRoot(event.subject)) {
-        event.subject.fx = margin; // keep roots on the left
-        event.subject.fy = event.subject.y; // allow y dragging
+        fixNode(event.subject, margin, event.subject.y); // keep roots on the left, allow y dragging
       } else {
-        event.subject.fx = event.subject.x;
-        event.subject.fy = event.subject.y;
+        fixNode(event.subject, event.subject.x, event.subject.y);
       }
     }
 
@@ -812,29 +1266,392 @@ HTML_TEMPLATE = """<!doctype html>
         if (Math.hypot(dx, dy) >= DRAG_THRESHOLD) {
           dragMoved = true;
           dragCount += 1;
+          sendLayout({ type: "dragging", active: true });
           warmup(0.2, 0.1, 8000);
         }
       }
-      event.subject.fx = event.x;
-      event.subject.fy = event.y;
+      fixNode(event.subject, event.x, event.y);
     }
 
     function dragended(event) {
       if (dragMoved) {
-        if (!event.active) simulation.alphaTarget(0);
+        if (!event.active) sendLayout({ type: "cool" });
         dragCount = Math.max(0, dragCount - 1);
+        sendLayout({ type: "dragging", active: dragCount > 0 });
       }
       if (lockableRoot(event.subject)) {
-        event.subject.fx = margin; // keep roots pinned on the left, free y
-        event.subject.fy = null;
+        fixNode(event.subject, margin, null); // keep roots pinned on the left, free y
       } else {
-        event.subject.fx = null;
-        event.subject.fy = null;
+        fixNode(event.subject, null, null);
       }
       dragStart = null;
       dragMoved = false;
     }
 
+    // Canvas renderer (toggle in the chart corner): draws the same nodes, rings, badges and links as the
+    // SVG, reading the visual states from page state instead of element classes. Hit testing for click,
+    // drag and hover goes through a quadtree of node positions, rebuilt after the positions change.
+    const RENDERER_KEY = "tarkov-quest-renderer";
+    const chartEl = document.getElementById("chart");
+    const renderToggleBtn = document.getElementById("render-toggle");
+    const canvasEl = document.createElement("canvas");
+    chartEl.appendChild(canvasEl);
+    const canvasCtx = canvasEl.getContext("2d");
+    const HIT_RADIUS = 14;
+    const LABEL_FONT = "'Inter', 'Segoe UI', system-ui, -apple-system, sans-serif";
+    function requestRender() {
+      if (!canvasMode || renderRequested) return;
+      renderRequested = true;
+      requestAnimationFrame(() => {
+        renderRequested = false;
+        drawCanvas();
+      });
+    }
+
+    // The SVG maps its viewBox into the element with "meet"; the canvas uses the same base mapping, so
+    // both surfaces show the graph at the same place and zoom transforms convert between them.
+    function canvasBase() {
+      const cw = chartEl.clientWidth || width;
+      const ch = chartEl.clientHeight || height;
+      const scale = Math.min(cw / width, ch / height);
+      return { scale, ox: (cw - width * scale) / 2, oy: (ch - height * scale) / 2 };
+    }
+
+    function toCanvasTransform(t) {
+      const { scale, ox, oy } = canvasBase();
+      return d3.zoomIdentity.translate(scale * t.x + ox - t.k * ox, scale * t.y + oy - t.k * oy).scale(t.k);
+    }
+
+    function toSvgTransform(t) {
+      const { scale, ox, oy } = canvasBase();
+      return d3.zoomIdentity.translate((t.x - ox + t.k * ox) / scale, (t.y - oy + t.k * oy) / scale).scale(t.k);
+    }
+
+    // Canvas pixel (CSS px) -> graph coordinates.
+    function canvasToGraph(px, py) {
+      const { scale, ox, oy } = canvasBase();
+      const [x, y] = d3.zoomTransform(canvasEl).invert([px, py]);
+      return [(x - ox) / scale, (y - oy) / scale];
+    }
+
+    function spatialIndex() {
+      if (!quadtree) quadtree = d3.quadtree(nodes, d => d.x, d => d.y);
+      return quadtree;
+    }
+
+    function nodeAt(px, py) {
+      const [x, y] = canvasToGraph(px, py);
+      return spatialIndex().find(x, y, HIT_RADIUS) || null;
+    }
+
+    // Graph-coordinate rectangle currently on screen (plus CULL_MARGIN) for the active surface.
+    function visibleRect() {
+      const { scale, ox, oy } = canvasBase();
+      const cw = chartEl.clientWidth || width;
+      const ch = chartEl.clientHeight || height;
+      let x0;
+      let y0;
+      let x1;
+      let y1;
+      if (canvasMode) {
+        [x0, y0] = canvasToGraph(0, 0);
+        [x1, y1] = canvasToGraph(cw, ch);
+      } else {
+        const t = d3.zoomTransform(svg.node());
+        [x0, y0] = t.invert([-ox / scale, -oy / scale]);
+        [x1, y1] = t.invert([(cw - ox) / scale, (ch - oy) / scale]);
+      }
+      return { x0: x0 - CULL_MARGIN, y0: y0 - CULL_MARGIN, x1: x1 + CULL_MARGIN, y1: y1 + CULL_MARGIN };
+    }
+
+    // Links touching each quest, by link index, so culling only visits links of on-screen quests.
+    const linksByNode = nodes.map(() => []);
+    links.forEach((l, k) => {
+      linksByNode[nodeIndexById.get(l.source.id)].push(k);
+      linksByNode[nodeIndexById.get(l.target.id)].push(k);
+    });
+
+    // Does the segment a-b cross rect? Bounding boxes must overlap and the rect's corners must not all lie
+    // on one side of the line (separating axes).
+    function segmentInRect(ax, ay, bx, by, rect) {
+      if (Math.max(ax, bx) < rect.x0 || Math.min(ax, bx) > rect.x1) return false;
+      if (Math.max(ay, by) < rect.y0 || Math.min(ay, by) > rect.y1) return false;
+      const side = (x, y) => Math.sign((bx - ax) * (y - ay) - (by - ay) * (x - ax));
+      const sides = side(rect.x0, rect.y0) + side(rect.x1, rect.y0) + side(rect.x0, rect.y1) + side(rect.x1, rect.y1);
+      return Math.abs(sides) < 4;
+    }
+
+    // Links by the midpoint of their segment; every quad also keeps the bounding box of all links below it
+    // (quad.box = [x0, y0, x1, y1]), so a query skips whole quads of links that can't reach the screen.
+    // Rebuilt with the node quadtree after the positions change.
+    function linkIndex() {
+      if (linkTree) return linkTree;
+      linkTree = d3.quadtree(
+        links.map((_, k) => k),
+        k => (links[k].source.x + links[k].target.x) / 2,
+        k => (links[k].source.y + links[k].target.y) / 2,
+      );
+      linkTree.visitAfter((quad) => {
+        const box = [Infinity, Infinity, -Infinity, -Infinity];
+        const grow = (x0, y0, x1, y1) => {
+          if (x0 < box[0]) box[0] = x0;
+          if (y0 < box[1]) box[1] = y0;
+          if (x1 > box[2]) box[2] = x1;
+          if (y1 > box[3]) box[3] = y1;
+        };
+        if (quad.length) {
+          quad.forEach((child) => { if (child) grow(...child.box); });
+        } else {
+          for (let leaf = quad; leaf; leaf = leaf.next) {
+            const { source, target } = links[leaf.data];
+            grow(Math.min(source.x, target.x), Math.min(source.y, target.y), Math.max(source.x, target.x), Math.max(source.y, target.y));
+          }
+        }
+        quad.box = box;
+      });
+      return linkTree;
+    }
+
+    // On-screen flags (1 = shown) for nodes and links: a quadtree query for the nodes, every link with an
+    // end among them, then the remaining links whose segment crosses the screen (long edges when zoomed in).
+    // That last pass only visits links whose bounding box overlaps the screen, and is skipped when every
+    // quest is on screen (all links are shown already).
+    function visibleFlags() {
+      const rect = visibleRect();
+      const shownNodes = new Uint8Array(nodes.length);
+      const shownLinks = new Uint8Array(links.length);
+      let shownCount = 0;
+      spatialIndex().visit((quad, qx0, qy0, qx1, qy1) => {
+        if (!quad.length) {
+          for (let leaf = quad; leaf; leaf = leaf.next) {
+            const d = leaf.data;
+            if (d.x >= rect.x0 && d.x <= rect.x1 && d.y >= rect.y0 && d.y <= rect.y1) {
+              const i = nodeIndexById.get(d.id);
+              shownNodes[i] = 1;
+              shownCount += 1;
+              linksByNode[i].forEach((k) => { shownLinks[k] = 1; });
+            }
+          }
+        }
+        return qx0 > rect.x1 || qy0 > rect.y1 || qx1 < rect.x0 || qy1 < rect.y0;
+      });
+      if (shownCount === nodes.length) return { nodes: shownNodes, links: shownLinks };
+      linkIndex().visit((quad) => {
+        const [x0, y0, x1, y1] = quad.box;
+        if (x0 > rect.x1 || y0 > rect.y1 || x1 < rect.x0 || y1 < rect.y0) return true;
+        if (!quad.length) {
+          for (let leaf = quad; leaf; leaf = leaf.next) {
+            const k = leaf.data;
+            const l = links[k];
+            if (!shownLinks[k] && segmentInRect(l.source.x, l.source.y, l.target.x, l.target.y, rect)) shownLinks[k] = 1;
+          }
+        }
+        return false;
+      });
+      return { nodes: shownNodes, links: shownLinks };
+    }
+
+    // SVG culling: off-screen <g>/<line> elements get display: none. Only elements whose flag changed
+    // are touched, once per frame at most.
+    let svgShown = null;
+    let cullRequested = false;
+
+    function requestCull() {
+      if (canvasMode || cullRequested) return;
+      cullRequested = true;
+      requestAnimationFrame(() => {
+        cullRequested = false;
+        if (!canvasMode) cullSvg();
+      });
+    }
+
+    function cullSvg() {
+      const next = visibleFlags();
+      const nodeEls = node.nodes();
+      const linkEls = link.nodes();
+      const apply = (els, flags, prev) => {
+        flags.forEach((flag, i) => {
+          if (prev && prev[i] === flag) return;
+          if (els[i]) els[i].style.display = flag ? "" : "none";
+        });
+      };
+      apply(nodeEls, next.nodes, svgShown && svgShown.nodes);
+      apply(linkEls, next.links, svgShown && svgShown.links);
+      svgShown = next;
+    }
+
+    function linkStyle(l) {
+      // Same precedence as the .link rules (the link group adds stroke-opacity 0.5 on top).
+      const ancestor = highlightSets.ancestors.has(l.target.id);
+      const descendant = highlightSets.descendants.has(l.source.id) && highlightSets.descendants.has(l.target.id);
+      let color = "rgba(148,163,184,0.25)";
+      if (ancestor) color = "rgba(56,189,248,0.425)";
+      if (descendant) color = "rgba(248,113,113,0.425)";
+      if (!filterMatches(l.source) || !filterMatches(l.target)) color = "rgba(148,163,184,0.075)";
+      return { color, width: ancestor || descendant ? 2.4 : 1.6 };
+    }
+
+    function ring(x, y, r, color, lineWidth, glow) {
+      canvasCtx.beginPath();
+      canvasCtx.arc(x, y, r, 0, Math.PI * 2);
+      canvasCtx.strokeStyle = color;
+      canvasCtx.lineWidth = lineWidth;
+      canvasCtx.shadowColor = glow || "transparent";
+      canvasCtx.shadowBlur = glow ? 8 : 0;
+      canvasCtx.stroke();
+      canvasCtx.shadowBlur = 0;
+    }
+
+    function label(text, x, y, size, fill, outline, align = "start", weight = 400) {
+      canvasCtx.font = `${weight} ${size}px ${LABEL_FONT}`;
+      canvasCtx.textAlign = align;
+      if (outline) {
+        canvasCtx.strokeStyle = outline.color;
+        canvasCtx.lineWidth = outline.width;
+        canvasCtx.strokeText(text, x, y);
+      }
+      canvasCtx.fillStyle = fill;
+      canvasCtx.fillText(text, x, y);
+    }
+
+    function drawNode(d, k) {
+      const completed = statusFor(d.id) === "completed";
+      const important = isImportant(d.id);
+      const ancestor = highlightSets.ancestors.has(d.id);
+      const descendant = highlightSets.descendants.has(d.id);
+      const selected = selectedNode && selectedNode.id === d.id;
+      // .node.is-completed text beats .node.is-important text, which beats the per-badge colours.
+      const textFill = base => (completed ? "#94a3b8" : important ? "#fef3c7" : base);
+      const { x, y } = d;
+
+      const simple = k < GLYPH_ZOOM;
+
+      canvasCtx.globalAlpha = filterMatches(d) ? 1 : 0.28;
+      if (!simple) {
+        if (isAvailable(d.id)) ring(x, y, 20, "#38bdf8", 4, "rgba(56,189,248,0.75)");
+        if (important) ring(x, y, 24, "#f59e0b", 4.5, "rgba(245,158,11,0.8)");
+        if (statusFor(d.id) !== "none") ring(x, y, 18, "#22c55e", 4);
+      }
+
+      let stroke = "#1f2937";
+      if (important) stroke = "#fbbf24";
+      if (selected) stroke = "#22d3ee";
+      if (ancestor) stroke = "#38bdf8";
+      if (descendant) stroke = "#f87171";
+      if (completed) stroke = "#475569";
+      const glow = descendant ? "rgba(248,113,113,0.75)" : ancestor ? "rgba(56,189,248,0.75)" : null;
+      canvasCtx.beginPath();
+      canvasCtx.arc(x, y, 12, 0, Math.PI * 2);
+      canvasCtx.fillStyle = completed ? "#334155" : colorByTrader(d.given_by);
+      canvasCtx.fill();
+      ring(x, y, 12, stroke, important || selected || ancestor || descendant ? 3 : 1.5, simple ? null : glow);
+      if (k < LABEL_ZOOM) {
+        canvasCtx.globalAlpha = 1;
+        return;
+      }
+
+      canvasCtx.textBaseline = "middle";
+      if (hasUnlocks(d)) label("+", x + 9, y - 8, 18, textFill("#f59e0b"), { color: "#0b1223", width: 2 }, "center", 800);
+      if (d.required_level) {
+        const fill = completed ? "#e2e8f0" : textFill("#f8fafc");
+        label(String(d.required_level), x, y + 4, 9, fill, { color: completed ? "#1f2937" : "#0b1223", width: 0.5 }, "center", 700);
+      }
+      canvasCtx.textBaseline = "alphabetic";
+      label(d.name, x + 12, y + 4, 12, textFill("#e5e7eb"));
+      const dependents = reach.descendantCounts[nodeIndexById.get(d.id)];
+      if (dependents) label(String(dependents), x + 6, y + 14, 9, textFill("#f8fafc"), { color: "#0b1223", width: 0.5 }, "start", 700);
+      canvasCtx.globalAlpha = 1;
+    }
+
+    function drawCanvas() {
+      const dpr = window.devicePixelRatio || 1;
+      const cw = canvasEl.clientWidth || width;
+      const ch = canvasEl.clientHeight || height;
+      if (canvasEl.width !== Math.round(cw * dpr) || canvasEl.height !== Math.round(ch * dpr)) {
+        canvasEl.width = Math.round(cw * dpr);
+        canvasEl.height = Math.round(ch * dpr);
+      }
+      const { scale, ox, oy } = canvasBase();
+      const t = d3.zoomTransform(canvasEl);
+      canvasCtx.setTransform(1, 0, 0, 1, 0, 0);
+      canvasCtx.clearRect(0, 0, canvasEl.width, canvasEl.height);
+      canvasCtx.setTransform(dpr * t.k * scale, 0, 0, dpr * t.k * scale, dpr * (t.x + t.k * ox), dpr * (t.y + t.k * oy));
+
+      const shown = visibleFlags();
+      links.forEach((l, k) => {
+        if (!shown.links[k]) return;
+        const style = linkStyle(l);
+        canvasCtx.beginPath();
+        canvasCtx.moveTo(l.source.x, l.source.y);
+        canvasCtx.lineTo(l.target.x, l.target.y);
+        canvasCtx.strokeStyle = style.color;
+        canvasCtx.lineWidth = style.width;
+        canvasCtx.stroke();
+      });
+      nodes.forEach((d, i) => {
+        if (shown.nodes[i]) drawNode(d, t.k);
+      });
+    }
+
+    // d3.drag on the canvas: the subject carries the pointer position, so event.x/y stay canvas pixels
+    // and are converted to graph coordinates before reaching the shared drag handlers.
+    function canvasDragEvent(event) {
+      const [x, y] = canvasToGraph(event.x, event.y);
+      return { subject: event.subject.node, x, y, active: event.active };
+    }
+
+    d3.select(canvasEl)
+      .call(d3.drag()
+        .container(canvasEl)
+        .subject((event) => {
+          const hit = nodeAt(event.x, event.y);
+          return hit ? { node: hit, x: event.x, y: event.y } : null;
+        })
+        .on("start", event => dragstarted(canvasDragEvent(event)))
+        .on("drag", event => dragged(canvasDragEvent(event)))
+        .on("end", event => dragended(canvasDragEvent(event))))
+      .call(zoom)
+      .on("click", (event) => {
+        const [px, py] = d3.pointer(event, canvasEl);
+        const hit = nodeAt(px, py);
+        if (!hit) return;
+        selectNode(hit);
+        highlightAncestry(hit.id);
+      })
+      .on("mousemove", (event) => {
+        const [px, py] = d3.pointer(event, canvasEl);
+        canvasEl.style.cursor = nodeAt(px, py) ? "pointer" : "";
+      });
+
+    function activeSurface() {
+      return canvasMode ? d3.select(canvasEl) : svg;
+    }
+
+    function setCanvasMode(enabled) {
+      if (enabled === canvasMode) return;
+      const current = d3.zoomTransform(activeSurface().node());
+      canvasMode = enabled;
+      chartEl.classList.toggle("canvas-mode", enabled);
+      if (renderToggleBtn) renderToggleBtn.classList.toggle("is-active", enabled);
+      if (enabled) {
+        d3.select(canvasEl).call(zoom.transform, toCanvasTransform(current));
+      } else {
+        svg.call(zoom.transform, toSvgTransform(current));
+        svgShown = null;
+        ticked();
+      }
+      requestRender();
+      try {
+        localStorage.setItem(RENDERER_KEY, enabled ? "canvas" : "svg");
+      } catch (_) {
+        // Ignore storage failures (private mode, quota).
+      }
+    }
+
+    if (renderToggleBtn) {
+      renderToggleBtn.addEventListener("click", () => setCanvasMode(!canvasMode));
+    }
+
     function colorByTrader(trader) {
       const palette = {
         "Prapor": "#3b82f6",
@@ -894,8 +1711,8 @@ HTML_TEMPLATE = """<!doctype html>
       highlightAncestry(n.id);
       const tx = width / 2 - n.x;
       const ty = height / 2 - n.y;
-      svg.transition().duration(400).call(zoom.transform, d3.zoomIdentity.translate(tx, ty).scale(1));
-      warmup();
+      const target = d3.zoomIdentity.translate(tx, ty).scale(1);
+      activeSurface().transition().duration(400).call(zoom.transform, canvasMode ? toCanvasTransform(target) : target);
     }
 
     function setLinks(boxId, list) {
@@ -928,10 +1745,11 @@ HTML_TEMPLATE = """<!doctype html>
       });
     }
 
-    function setRewards(list) {
+    function setRewards(d) {
       const container = document.querySelector("#rewards-box .rewards-body");
       if (!container) return;
       container.innerHTML = "";
+      const list = d.rewards;
       if (!list || !list.length) {
         const empty = document.createElement("p");
         empty.textContent = "-";
@@ -948,22 +1766,8 @@ HTML_TEMPLATE = """<!doctype html>
         other: [],
       };
 
-      list.forEach((raw) => {
-        const reward = (raw || "").trim();
-        if (!reward) return;
-        if (UNLOCK_RE.test(reward)) {
-          buckets.unlocks.push(reward);
-        } else if (XP_RE.test(reward)) {
-          buckets.xp.push(reward);
-        } else if (REP_RE.test(reward) || REP_FALLBACK_RE.test(reward)) {
-          buckets.rep.push(reward);
-        } else if (MONEY_RE.test(reward)) {
-          buckets.money.push(reward);
-        } else if (ITEM_RE.test(reward) || ITEM_COUNT_RE.test(reward)) {
-          buckets.items.push(reward);
-        } else {
-          buckets.other.push(reward);
-        }
+      list.forEach((reward, i) => {
+        buckets[d.reward.groups[i]].push(reward);
       });
 
       const groups = [
@@ -1006,6 +1810,7 @@ HTML_TEMPLATE = """<!doctype html>
     function selectNode(d) {
       selectedNode = d;
       node.classed("selected", n => n.id === d.id);
+      requestRender();
       card.querySelector("h1").textContent = d.name;
       card.querySelector(".meta").innerHTML = `
         <span class="chip">Given by: ${d.given_by || "-"}</span>
@@ -1018,9 +1823,10 @@ HTML_TEMPLATE = """<!doctype html>
       openLinkBtn.onclick = (e) => {
         if (!d.url) e.preventDefault();
       };
-      setList("objectives-box", d.objectives);
-      setRewards(d.rewards);
-      setList("requirements-box", d.requirements);
+      const details = questDetails(d);
+      setList("objectives-box", details.objectives);
+      setRewards(d);
+      setList("requirements-box", details.requirements);
       setLinks("previous-box", d.previous);
       setLinks("leads-box", d.leads_to);
       updateProgressButtons();
@@ -1072,39 +1878,29 @@ HTML_TEMPLATE = """<!doctype html>
       }
     }
 
-    function filterCount(overrides = {}) {
-      const merged = {
-        trader: filterState.trader,
-        location: filterState.location,
-        unlocks: new Set(filterState.unlocks),
-        xpMin: filterState.xpMin,
-        xpMax: filterState.xpMax,
-        ...overrides,
-      };
-      return nodes.reduce((acc, n) => acc + (filterMatches(n, merged) ? 1 : 0), 0);
-    }
-
+    // Option counts: the other filters' mask is built once, then intersected with each value's bitset.
     function buildFilterOptions(selectEl, values, includeUnknown = false, key = "generic") {
       if (!selectEl) return;
       const current = selectEl.value || "all";
       selectEl.innerHTML = "";
+      const others = key === "generic" ? null : filterMask({ ...filterState, [key]: "all" });
+      const facet = facets[key];
+      const countFor = bits => (key === "generic" ? nodes.length : countAnd(others, bits));
       const allOpt = document.createElement("option");
       allOpt.value = "all";
-      const allCount = key === "generic" ? nodes.length : filterCount({ [key]: "all" });
-      allOpt.textContent = `All (${allCount})`;
+      allOpt.textContent = `All (${countFor(null)})`;
       selectEl.appendChild(allOpt);
       if (includeUnknown) {
         const unknownOpt = document.createElement("option");
         unknownOpt.value = "unknown";
-        const unknownCount = key === "generic" ? 0 : filterCount({ [key]: "unknown" });
+        const unknownCount = key === "generic" ? 0 : countFor(facet.unknown);
         unknownOpt.textContent = `Unknown (${unknownCount})`;
         selectEl.appendChild(unknownOpt);
       }
       values.forEach((val) => {
         const opt = document.createElement("option");
         opt.value = val;
-        const count = key === "generic" ? nodes.length : filterCount({ [key]: val });
-        opt.textContent = `${val} (${count})`;
+        opt.textContent = `${val} (${countFor(facet ? facet.values.get(val) : null)})`;
         selectEl.appendChild(opt);
       });
       if (Array.from(selectEl.options).some(opt => opt.value === current)) {
@@ -1114,40 +1910,8 @@ HTML_TEMPLATE = """<!doctype html>
 
 
     function refreshFilterOptions() {
-      buildFilterOptions(filterTrader, traders, nodes.some(n => !n.given_by), "trader");
-      buildFilterOptions(filterLocation, locations, nodes.some(n => !n.location), "location");
-    }
-
-    function parseLocationList(raw) {
-      if (!raw) return [];
-      return String(raw)
-        .split(",")
-        .map(part => part.trim())
-        .filter(Boolean);
-    }
-
-    function parseXpReward(rewards) {
-      if (!rewards) return null;
-      for (const reward of rewards) {
-        const match = String(reward).match(/([0-9][0-9,]*)\\s*EXP/i);
-        if (match) {
-          const value = parseInt(match[1].replace(/,/g, ""), 10);
-          if (!Number.isNaN(value)) return value;
-        }
-      }
-      return null;
-    }
-
-    function unlockTypesFor(rewards) {
-      const types = new Set();
-      if (!rewards) return types;
-      rewards.forEach((reward) => {
-        const match = String(reward).match(/^Unlocks\\s+(purchase|barter|craft)/i);
-        if (match) {
-          types.add(match[1].toLowerCase());
-        }
-      });
-      return types;
+      buildFilterOptions(filterTrader, traders, !!facets.trader.unknown, "trader");
+      buildFilterOptions(filterLocation, locations, !!facets.location.unknown, "location");
     }
 
     function formatXpValue(value) {
@@ -1193,43 +1957,66 @@ HTML_TEMPLATE = """<!doctype html>
       updateXpTrack(minValue, maxValue, bounds);
     }
 
-    function filterMatches(node, state = filterState) {
-      if (!node) return false;
-      if (state.trader != null && state.trader !== "all") {
-        if (state.trader === "unknown") {
-          if (node.given_by) return false;
-        } else if (node.given_by !== state.trader) {
-          return false;
-        }
+    // Quests with an XP reward, sorted by XP, so an XP range is one contiguous slice.
+    const xpOrder = nodes
+      .map((n, i) => i)
+      .filter(i => nodes[i].reward.xp != null)
+      .sort((a, b) => nodes[a].reward.xp - nodes[b].reward.xp);
+
+    function xpSliceStart(value) {
+      let lo = 0;
+      let hi = xpOrder.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (nodes[xpOrder[mid]].reward.xp < value) lo = mid + 1;
+        else hi = mid;
       }
-      if (state.location != null && state.location !== "all") {
-        const locations = parseLocationList(node.location);
-        if (state.location === "unknown") {
-          if (locations.length) return false;
-        } else if (!locations.includes(state.location)) {
-          return false;
-        }
+      return lo;
+    }
+
+    function xpMask(min, max) {
+      const bits = new Uint32Array(facets.words);
+      for (let k = xpSliceStart(min); k < xpOrder.length && nodes[xpOrder[k]].reward.xp <= max; k++) {
+        bits[xpOrder[k] >> 5] |= 1 << (xpOrder[k] & 31);
       }
+      return bits;
+    }
+
+    // Bitset of the quests passing every active filter (null when no filter is active).
+    function filterMask(state = filterState) {
+      const parts = [];
+      [["trader", state.trader], ["location", state.location]].forEach(([key, value]) => {
+        if (value == null || value === "all") return;
+        const facet = facets[key];
+        parts.push((value === "unknown" ? facet.unknown : facet.values.get(value)) || new Uint32Array(facets.words));
+      });
       if (state.unlocks && state.unlocks.size) {
-        const unlocks = unlockTypesFor(node.rewards);
-        let matchesUnlock = false;
-        state.unlocks.forEach((type) => {
-          if (unlocks.has(type)) matchesUnlock = true;
+        const any = new Uint32Array(facets.words);
+        state.unlocks.forEach((kind) => {
+          const bits = facets.unlock.values.get(kind);
+          if (bits) bits.forEach((word, w) => { any[w] |= word; });
         });
-        if (!matchesUnlock) return false;
+        parts.push(any);
       }
       if (state.xpMin != null && state.xpMax != null) {
-        const xp = parseXpReward(node.rewards);
         const boundsActive = state.xpMin > xpBounds.min || state.xpMax < xpBounds.max;
-        if (boundsActive) {
-          if (xp == null) return false;
-          if (xp < state.xpMin || xp > state.xpMax) return false;
-        }
+        if (boundsActive) parts.push(xpMask(state.xpMin, state.xpMax));
       }
-      return true;
+      if (!parts.length) return null;
+      const mask = Uint32Array.from(parts[0]);
+      parts.slice(1).forEach(bits => bits.forEach((word, w) => { mask[w] &= word; }));
+      return mask;
+    }
+
+    let activeMask = null;
+
+    function filterMatches(node, mask = activeMask) {
+      if (!node) return false;
+      return !mask || hasBit(mask, nodeIndexById.get(node.id));
     }
 
     function applyFilters() {
+      activeMask = filterMask(filterState);
       node.classed("is-filtered", d => !filterMatches(d));
       link.classed("is-filtered", l => {
         const src = l.source.id ? l.source : nodesById.get(l.source);
@@ -1237,6 +2024,7 @@ HTML_TEMPLATE = """<!doctype html>
         return !filterMatches(src) || !filterMatches(tgt);
       });
       renderSearchResults(search.value.trim().toLowerCase());
+      requestRender();
     }
 
     function updateImportantButton() {
@@ -1247,53 +2035,96 @@ HTML_TEMPLATE = """<!doctype html>
 
     function applyImportantToNode(id) {
       const important = isImportant(id);
-      node.filter(d => d.id === id)
-        .classed("is-important", important)
-        .select("circle.important-ring")
-        .attr("opacity", important ? 1 : 0);
+      const el = nodeElement(nodeIndexById.get(id));
+      if (el) {
+        d3.select(el)
+          .classed("is-important", important)
+          .select("circle.important-ring")
+          .attr("opacity", important ? 1 : 0);
+      }
+      requestRender();
     }
 
     function applyImportantToNodes() {
       node.classed("is-important", d => isImportant(d.id));
       node.select("circle.important-ring")
         .attr("opacity", d => isImportant(d.id) ? 1 : 0);
+      requestRender();
     }
 
-    function computeAvailableSet() {
-      const children = buildChildren();
-      const completed = new Set();
-      nodes.forEach(n => {
-        if (statusFor(n.id) === "completed") completed.add(n.id);
-      });
-      const next = new Set();
-      completed.forEach((id) => {
-        const targets = children.get(id) || [];
-        targets.forEach((childId) => {
-          if (!completed.has(childId)) next.add(childId);
-        });
-      });
-      availableSet = next;
+    function availableAt(i) {
+      return !completedFlags[i] && completedParents[i] > 0;
+    }
+
+    // The quest's <g> by node index (the join keeps the nodes' order).
+    let nodeElements = null;
+    function nodeElement(i) {
+      if (!nodeElements) nodeElements = node.nodes();
+      return nodeElements[i] || null;
     }
 
+    function renderAvailable(i) {
+      const el = nodeElement(i);
+      if (!el) return;
+      const available = availableAt(i);
+      d3.select(el)
+        .classed("is-available", available)
+        .select("circle.available-ring")
+        .attr("opacity", available ? 1 : 0);
+    }
+
+    // Rebuild every counter from progressMap (page load, import, clear), then restyle all quests.
     function applyAvailableToNodes() {
-      computeAvailableSet();
+      completedFlags.fill(0);
+      completedParents.fill(0);
+      nodes.forEach((n, i) => {
+        if (statusFor(n.id) === "completed") completedFlags[i] = 1;
+      });
+      childIndices.forEach((children, i) => {
+        if (completedFlags[i]) children.forEach((c) => { completedParents[c] += 1; });
+      });
+      availableSet = new Set(nodes.filter((n, i) => availableAt(i)).map(n => n.id));
       node.classed("is-available", d => isAvailable(d.id));
       node.select("circle.available-ring")
         .attr("opacity", d => isAvailable(d.id) ? 1 : 0);
+      requestRender();
     }
 
+    // O(degree) update after one quest's status changed: its own flag, its children's counters, and
+    // only the elements whose completed/available state actually flipped.
     function applyProgressToNode(id) {
+      const i = nodeIndexById.get(id);
+      if (i == null) return;
       const status = statusFor(id);
-      const target = nodesById.get(id);
-      if (target) {
-        target.progress = status;
+      const done = status === "completed" ? 1 : 0;
+      nodes[i].progress = status;
+      const el = nodeElement(i);
+      if (el) {
+        d3.select(el)
+          .classed("is-completed", done === 1)
+          .select("circle.status-ring")
+          .attr("stroke", statusColor(status))
+          .attr("opacity", status === "none" ? 0 : 1);
       }
-      node.filter(d => d.id === id)
-        .classed("is-completed", status === "completed")
-        .select("circle.status-ring")
-        .attr("stroke", statusColor(status))
-        .attr("opacity", status === "none" ? 0 : 1);
-      applyAvailableToNodes();
+      if (completedFlags[i] === done) {
+        requestRender();
+        return;
+      }
+      const touched = [i];
+      const before = touched.concat(childIndices[i]).map(availableAt);
+      completedFlags[i] = done;
+      childIndices[i].forEach((c) => {
+        completedParents[c] += done ? 1 : -1;
+        touched.push(c);
+      });
+      touched.forEach((c, k) => {
+        const available = availableAt(c);
+        if (available === before[k]) return;
+        if (available) availableSet.add(nodes[c].id);
+        else availableSet.delete(nodes[c].id);
+        renderAvailable(c);
+      });
+      requestRender();
     }
 
     function applyProgressToNodes() {
@@ -1500,51 +2331,20 @@ HTML_TEMPLATE = """<!doctype html>
       });
     }
 
-    // Build reverse adjacency for ancestor highlighting (normalize ids)
-    function buildParents() {
-      const pmap = new Map();
-      links.forEach(l => {
-        const src = l.source.id ? l.source.id : l.source;
-        const tgt = l.target.id ? l.target.id : l.target;
-        if (!pmap.has(tgt)) pmap.set(tgt, []);
-        pmap.get(tgt).push(src);
-      });
-      return pmap;
-    }
-
-    function buildChildren() {
-      const cmap = new Map();
-      links.forEach(l => {
-        const src = l.source.id ? l.source.id : l.source;
-        const tgt = l.target.id ? l.target.id : l.target;
-        if (!cmap.has(src)) cmap.set(src, []);
-        cmap.get(src).push(tgt);
-      });
-      return cmap;
-    }
-
-    function collectAncestors(id, parents, acc = new Set()) {
-      if (acc.has(id)) return acc;
-      acc.add(id);
-      const ps = parents.get(id) || [];
-      ps.forEach(p => collectAncestors(p, parents, acc));
-      return acc;
-    }
-
-    function collectDescendants(id, children, acc = new Set()) {
-      if (acc.has(id)) return acc;
-      acc.add(id);
-      const cs = children.get(id) || [];
-      cs.forEach(c => collectDescendants(c, children, acc));
-      return acc;
+    // The quest itself plus every quest reach.ancestors/reach.descendants lists for it
+    function reachableIds(lookup, id) {
+      const ids = new Set([id]);
+      const idx = nodeIndexById.get(id);
+      if (idx != null) lookup(idx).forEach(i => ids.add(nodes[i].id));
+      return ids;
     }
 
     // Highlight ancestors (previous) in blue and descendants (leads_to) in red
     function highlightAncestry(selectedId) {
-      const parents = buildParents();
-      const ancestorIds = collectAncestors(selectedId, parents);
-      const children = buildChildren();
-      const descendantIds = collectDescendants(selectedId, children);
+      const ancestorIds = reachableIds(reach.ancestors, selectedId);
+      const descendantIds = reachableIds(reach.descendants, selectedId);
+      highlightSets = { ancestors: ancestorIds, descendants: descendantIds };
+      requestRender();
       node.classed("ancestor", d => ancestorIds.has(d.id));
       node.classed("descendant", d => descendantIds.has(d.id));
       link.classed("ancestor-link", l => {
@@ -1558,47 +2358,102 @@ HTML_TEMPLATE = """<!doctype html>
       });
     }
 
-    function rewardMatches(node, term) {
-      if (!term) return [];
-      const rewards = node.rewards || [];
-      const hits = [];
-      for (const r of rewards) {
-        if (!r.includes("×")) continue;
-        const m = r.match(/([0-9]+)\s*×\s*(.+)/);
-        const itemName = m ? m[2].trim() : r;
-        const count = m ? parseInt(m[1], 10) : 1;
-        if (itemName.toLowerCase().includes(term)) {
-          hits.push({ item: itemName, count });
-        }
-      }
-      return hits;
-    }
-
-    function unlockMatches(node, term) {
-          if (!term) return [];
-          const rewards = node.rewards || [];
-          const hits = [];
-          for (const r of rewards) {
-            const lower = r.toLowerCase();
-            if (!lower.startsWith("unlocks")) continue;
-            // Match purchase/barter/craft unlocks and capture the item name and location
-            const m = r.match(/^Unlocks\\s+(purchase|barter|craft)\\s+(?:for\\s+|of\\s+)?(.+?)(?:\\s+at\\s+(.+))?$/i);
-            if (!m || !m[2]) continue;
-            const kind = m[1] ? m[1].toLowerCase() : "unlock";
-            const itemName = m[2].trim();
-            const place = m[3] ? m[3].trim() : "";
-            if (itemName.toLowerCase().includes(term)) {
-              hits.push({ item: itemName, count: 1, kind, place });
-            }
+    // Search index: names plus the reward/unlock item tables from the quest-search block, parsed on first use.
+    // Trigram postings are derived here from the key tables instead of being shipped in the page.
+    let searchIndex = null;
+
+    function searchSection(keys, hits) {
+      return { keys, hits, lower: keys.map(k => k.toLowerCase()), grams: null };
+    }
+
+    function buildGrams(lower) {
+      const grams = new Map();
+      lower.forEach((key, id) => {
+        for (let j = 0; j + 3 <= key.length; j++) {
+          const gram = key.slice(j, j + 3);
+          const posting = grams.get(gram);
+          if (!posting) {
+            grams.set(gram, [id]);
+          } else if (posting[posting.length - 1] !== id) {
+            posting.push(id);
           }
-          return hits;
         }
+      });
+      return grams;
+    }
+
+    function intersectSorted(a, b) {
+      const out = [];
+      let i = 0;
+      let j = 0;
+      while (i < a.length && j < b.length) {
+        if (a[i] === b[j]) {
+          out.push(a[i]);
+          i += 1;
+          j += 1;
+        } else if (a[i] < b[j]) {
+          i += 1;
+        } else {
+          j += 1;
+        }
+      }
+      return out;
+    }
+
+    function loadSearchIndex() {
+      if (searchIndex) return searchIndex;
+      const raw = readPayload("quest-search");
+      const rewardHits = unpackLists(raw.reward.hits);
+      const unlockHits = unpackLists(raw.unlock.hits);
+      let offset = 0;
+      const rewards = rewardHits.map(row => Array.from(row, nodeIdx => ({
+        node: nodes[nodeIdx],
+        count: raw.reward.amounts[offset++],
+      })));
+      offset = 0;
+      const unlocks = unlockHits.map(row => Array.from(row, nodeIdx => {
+        const hit = {
+          node: nodes[nodeIdx],
+          count: 1,
+          kind: strings[raw.unlock.kinds[offset]],
+          place: raw.unlock.places[offset] < 0 ? "" : strings[raw.unlock.places[offset]],
+        };
+        offset += 1;
+        return hit;
+      }));
+      searchIndex = {
+        name: searchSection(nodes.map(n => n.name), nodes.map(n => [{ node: n }])),
+        reward: searchSection(raw.reward.keys.map(k => strings[k]), rewards),
+        unlock: searchSection(raw.unlock.keys.map(k => strings[k]), unlocks),
+      };
+      return searchIndex;
+    }
+
+    // Ids of the keys containing term, in key order: trigram candidates, then a substring check.
+    function matchingKeys(section, term) {
+      if (term.length < 3) {
+        const ids = [];
+        section.lower.forEach((key, id) => {
+          if (key.includes(term)) ids.push(id);
+        });
+        return ids;
+      }
+      if (!section.grams) section.grams = buildGrams(section.lower);
+      let candidates = null;
+      for (let j = 0; j + 3 <= term.length; j++) {
+        const posting = section.grams.get(term.slice(j, j + 3));
+        if (!posting) return [];
+        candidates = candidates ? intersectSorted(candidates, posting) : posting;
+      }
+      return candidates.filter(id => section.lower[id].includes(term));
+    }
 
     function renderSearchResults(term) {
         searchResults.innerHTML = "";
         if (!term) return;
+      const index = loadSearchIndex();
       if (searchMode === "name") {
-        const matches = nodes.filter(n => n.name.toLowerCase().includes(term)).slice(0, 25);
+        const matches = matchingKeys(index.name, term).slice(0, 25).map(id => nodes[id]);
         matches.forEach(n => {
           const pill = document.createElement("span");
           pill.className = "pill";
@@ -1610,15 +2465,10 @@ HTML_TEMPLATE = """<!doctype html>
         return;
       }
 
-      const groups = new Map(); // item -> [{node, count}]
-      const matcher = searchMode === "reward" ? rewardMatches : unlockMatches;
-      nodes.forEach(n => {
-        matcher(n, term).forEach(hit => {
-          if (!groups.has(hit.item)) groups.set(hit.item, []);
-          groups.get(hit.item).push({ node: n, count: hit.count, kind: hit.kind, place: hit.place });
-        });
-      });
-      Array.from(groups.entries()).slice(0, 25).forEach(([item, arr]) => {
+      const section = searchMode === "reward" ? index.reward : index.unlock;
+      matchingKeys(section, term).slice(0, 25).forEach((id) => {
+        const item = section.keys[id];
+        const arr = section.hits[id];
         const box = document.createElement("div");
         box.className = "item-group";
         const title = document.createElement("div");
@@ -1657,9 +2507,9 @@ HTML_TEMPLATE = """<!doctype html>
     // Preselect first node
     selectNode(nodes[0]);
     highlightAncestry(nodes[0].id);
-    warmup();
-    const traders = Array.from(new Set(nodes.map(n => n.given_by).filter(Boolean))).sort();
-    const locations = Array.from(new Set(nodes.flatMap(n => parseLocationList(n.location)))).sort();
+    ticked();
+    const traders = facets.trader.keys;
+    const locations = facets.location.keys;
     refreshFilterOptions();
     renderTraderLegend(traders);
     xpBounds.min = XP_SLIDER_MIN;
@@ -1679,129 +2529,125 @@ HTML_TEMPLATE = """<!doctype html>
       if (xpMaxLabel) xpMaxLabel.textContent = formatXpValue(xpBounds.max);
     }
     applyFilters();
+    try {
+      if (localStorage.getItem(RENDERER_KEY) === "canvas") setCanvasMode(true);
+    } catch (_) {
+      // Ignore storage failures (private mode, quota).
+    }
+    requestCull();
   </script>
 </body>
 </html>
 """
 
 
-def normalize_list(raw: str) -> List[str]:
-    if not raw or pd.isna(raw):
-        return []
-    parts = [p.strip() for p in str(raw).split("|")]
-    return [p for p in parts if p]
-
-
-def parse_required_level(requirements: List[str]):
-    for req in requirements:
-        match = re.search(r"must be level\s*(\d+)", req, flags=re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-    return None
+LIST_COLUMNS = ["dialogue", "requirements", "objectives", "rewards", "previous", "leads_to"]
+TEXT_COLUMNS = ["location", "given_by"]
+REQUIRED_LEVEL_RE = r"(?i)must be level\s*(\d+)"
+WIKI_URL = "https://escapefromtarkov.fandom.com/wiki/"
+
+
+def split_list_column(series: pd.Series) -> pd.Series:
+    """
+    Explode a pipe-delimited column into one stripped, non-empty item per entry, indexed by source row.
+    """
+    parts = series.dropna().astype(str).str.split("|").explode().str.strip()
+    return parts[parts != ""]
+
+
+def collect_lists(parts: pd.Series) -> pd.Series:
+    """
+    Regroup exploded items into one list per source row; rows without items are left out.
+    """
+    rows = parts.index.to_numpy()
+    if not len(rows):
+        return pd.Series(dtype=object)
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    values = parts.tolist()
+    bounds = starts.tolist() + [len(values)]
+    chunks = [values[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+    return pd.Series(chunks, index=rows[starts], dtype=object)
+
+
+def first_per_name(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse rows sharing a quest name, keeping the first non-empty value of every column.
+    """
+    return frame.groupby("name", sort=False).first()
+
+
+def build_graph(df: pd.DataFrame, link_map: Dict[str, str], layering: str = DEFAULT_LAYERING):
+    df = df.reset_index(drop=True)
+    names = df["name"]
+    items = {col: split_list_column(df[col]) if col in df else pd.Series(dtype=object) for col in LIST_COLUMNS}
+
+    fields = pd.DataFrame({"name": names})
+    for col in TEXT_COLUMNS:
+        fields[col] = df[col] if col in df else None
+    for col in LIST_COLUMNS:
+        # Rows whose lists come out empty stay NaN, so first() skips them like an unset field.
+        fields[col] = collect_lists(items[col])
+    fields = first_per_name(fields)
+
+    requirements = fields["requirements"].dropna().explode()
+    levels_found = requirements.str.extract(REQUIRED_LEVEL_RE, expand=False).dropna()
+    required_level = levels_found.groupby(level=0, sort=False).first()
+
+    # Edges: previous -> quest and quest -> leads_to, deduplicated and sorted by (source, target).
+    prev, nxt = items["previous"], items["leads_to"]
+    edges = pd.DataFrame({
+        "source": pd.concat([prev, names.loc[nxt.index]], ignore_index=True),
+        "target": pd.concat([names.loc[prev.index], nxt], ignore_index=True),
+    })
+    edges = edges.drop_duplicates().sort_values(["source", "target"])
+    link_set = list(zip(edges["source"].tolist(), edges["target"].tolist()))
+
+    # Node order: each row's quest, then the quests it names under previous, then under leads_to.
+    mentions = pd.concat([
+        pd.DataFrame({"row": names.index, "part": 0, "name": names}),
+        pd.DataFrame({"row": prev.index, "part": 1, "name": prev.to_numpy()}),
+        pd.DataFrame({"row": nxt.index, "part": 2, "name": nxt.to_numpy()}),
+    ])
+    order = mentions.sort_values(["row", "part"], kind="stable")["name"].drop_duplicates().tolist()
+
+    # Quests only named under previous/leads_to get a row of NaNs here, i.e. empty fields.
+    fields = fields.reindex(order)
+    text = {col: fields[col].astype(object).where(fields[col].notna(), None).tolist() for col in TEXT_COLUMNS}
+    lists = {col: [v if isinstance(v, list) else [] for v in fields[col]] for col in LIST_COLUMNS}
+    levels_required = [None if pd.isna(v) else int(v) for v in required_level.reindex(order)]
 
-
-def build_graph(df: pd.DataFrame, link_map: Dict[str, str]):
     nodes: Dict[str, Dict] = {}
-    link_set = set()
-
-    def clean_value(val):
-        return None if val is None or (isinstance(val, float) and pd.isna(val)) else val
-
-    def ensure_node(name: str, row_data=None):
-        # Fallback wiki URL even if quest_links lookup misses a title match.
-        def resolved_url(n: str):
-            if not n:
-                return None
-            return link_map.get(n) or f"https://escapefromtarkov.fandom.com/wiki/{quote(n.replace(' ', '_'))}"
-
-        if name not in nodes:
-            nodes[name] = {
-                "id": name,
-                "name": name,
-                "location": None,
-                "given_by": None,
-                "url": resolved_url(name),
-                "dialogue": [],
-                "requirements": [],
-                "required_level": None,
-                "objectives": [],
-                "rewards": [],
-                "previous": [],
-                "leads_to": [],
-            }
-        node = nodes[name]
-        if row_data is not None:
-            if not node.get("location"):
-                node["location"] = clean_value(row_data.get("location"))
-            if not node.get("given_by"):
-                node["given_by"] = clean_value(row_data.get("given_by"))
-            if not node.get("url"):
-                node["url"] = clean_value(row_data.get("url")) or resolved_url(name)
-            if not node.get("dialogue"):
-                node["dialogue"] = normalize_list(row_data.get("dialogue"))
-            if not node.get("requirements"):
-                node["requirements"] = normalize_list(row_data.get("requirements"))
-            if node.get("required_level") is None:
-                node["required_level"] = parse_required_level(node.get("requirements", []))
-            if not node.get("objectives"):
-                node["objectives"] = normalize_list(row_data.get("objectives"))
-            if not node.get("rewards"):
-                node["rewards"] = normalize_list(row_data.get("rewards"))
-            if not node.get("previous"):
-                node["previous"] = normalize_list(row_data.get("previous"))
-            if not node.get("leads_to"):
-                node["leads_to"] = normalize_list(row_data.get("leads_to"))
-        return node
-
-    links = []
-    for _, row in df.iterrows():
-        quest_name = row["name"]
-        ensure_node(quest_name, row)
-
-        for prev in normalize_list(row.get("previous")):
-            ensure_node(prev)
-            link_set.add((prev, quest_name))
-
-        for nxt in normalize_list(row.get("leads_to")):
-            ensure_node(nxt)
-            link_set.add((quest_name, nxt))
-
-    links = [{"source": s, "target": t} for (s, t) in sorted(link_set)]
-
-    # Level assignment using multi-source BFS (shortest depth from any root) to avoid runaway levels in cycles.
-    indegree = {n: 0 for n in nodes}
-    adjacency: Dict[str, List[str]] = {}
-    for s, t in link_set:
-        indegree[t] = indegree.get(t, 0) + 1
-        indegree.setdefault(s, 0)
-        adjacency.setdefault(s, []).append(t)
-
-    roots = [n for n, deg in indegree.items() if deg == 0] or list(nodes.keys())
-    levels = {n: float("inf") for n in nodes}
-    for r in roots:
-        levels[r] = 0
-
-    queue = list(roots)
-    while queue:
-        cur = queue.pop(0)
-        cur_level = levels[cur]
-        for nxt in adjacency.get(cur, []):
-            if cur_level + 1 < levels[nxt]:
-                levels[nxt] = cur_level + 1
-                queue.append(nxt)
-
-    # Replace inf (isolated nodes) with 0
-    for n in levels:
-        if levels[n] == float("inf"):
-            levels[n] = 0
+    for idx, name in enumerate(order):
+        nodes[name] = {
+            "id": name,
+            "name": name,
+            "location": text["location"][idx],
+            "given_by": text["given_by"][idx],
+            # Fallback wiki URL even if quest_links lookup misses a title match.
+            "url": (link_map.get(name) or f"{WIKI_URL}{quote(name.replace(' ', '_'))}") if name else None,
+            "dialogue": lists["dialogue"][idx],
+            "requirements": lists["requirements"][idx],
+            "required_level": levels_required[idx],
+            "objectives": lists["objectives"][idx],
+            "rewards": lists["rewards"][idx],
+            "reward": parse_rewards(lists["rewards"][idx]),
+            "previous": lists["previous"][idx],
+            "leads_to": lists["leads_to"][idx],
+        }
+
+    links = [{"source": s, "target": t} for (s, t) in link_set]
 
+    levels = assign_levels(order, link_set, layering)
     for name, node in nodes.items():
-        node["level"] = levels.get(name, 0)
+        node["level"] = levels[name]
 
     return list(nodes.values()), links
 
 
-def main():
+def load_graph(layering: str = DEFAULT_LAYERING):
+    """
+    Nodes and links from src/quests.csv, with wiki URLs from quest_links.json when it exists.
+    """
     df = pd.read_csv("src/quests.csv", encoding="utf-8")
 
     link_map: Dict[str, str] = {}
@@ -1810,12 +2656,35 @@ def main():
         for entry in json.loads(link_file.read_text(encoding="utf-8")):
             link_map[entry.get("title")] = entry.get("href")
 
-    nodes, links = build_graph(df, link_map)
+    return build_graph(df, link_map, layering)
+
 
+def main():
+    parser = argparse.ArgumentParser(description="Render the quest tree from src/quests.csv into index.html.")
+    parser.add_argument(
+        "--layering",
+        choices=sorted(LAYERINGS),
+        default=DEFAULT_LAYERING,
+        help="shortest: BFS depth from the nearest root; longest: below the deepest prerequisite",
+    )
+    args = parser.parse_args()
+
+    nodes, links = load_graph(args.layering)
+    names = [n["id"] for n in nodes]
+    edges = [(l["source"], l["target"]) for l in links]
+    for cycle in find_cycles(names, edges):
+        print(f"Warning: quests form a prerequisite cycle: {', '.join(cycle)}")
+    reach = reachability_index(names, edges)
+    layout = layered_layout(names, edges, [n["level"] for n in nodes])
+
+    strings = StringTable()
+    graph = encode_graph(nodes, links, reach, layout, strings)
+    search = encode_search(nodes, strings)
     html = (
         HTML_TEMPLATE
-        .replace("__NODES__", json.dumps(nodes, ensure_ascii=False))
-        .replace("__LINKS__", json.dumps(links, ensure_ascii=False))
+        .replace("__GRAPH__", json_script(graph))
+        .replace("__DETAILS__", encode_details(nodes))
+        .replace("__SEARCH__", json_script(search))
     )
 
     out_path = Path("index.html")
@@ -3,12 +3,15 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
+import wiki_api
+import wiki_http
+from quest_parsers import DEFAULT_PARSER, PARSERS, lxml_html, lxml_text, xpath_has_class
+
 # Default locations and selectors for the live wiki page.
 DEFAULT_URL = "https://escapefromtarkov.fandom.com/wiki/Quests"
 DEFAULT_OUTPUT = "quest_links.json"
@@ -18,48 +21,87 @@ USER_AGENT = "quest-link-scraper/1.0 (+https://github.com/)"
 
 
 def fetch_html(url: str) -> str:
-    resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=30)
-    resp.raise_for_status()
-    return resp.text
+    return wiki_http.fetch_html(url, USER_AGENT)
 
 
-def extract_quest_links(html_text: str, base_url: str = DEFAULT_BASE_URL) -> List[Dict[str, str]]:
+def extract_quest_links(
+    html_text: str,
+    base_url: str = DEFAULT_BASE_URL,
+    parser: str = DEFAULT_PARSER,
+) -> List[Dict[str, str]]:
     """
     Parse the quest navbox and return quest links with their owning trader.
     """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser {parser!r}; choose from {', '.join(PARSERS)}")
+    rows = iter_navbox_rows_lxml(html_text) if parser == "lxml" else iter_navbox_rows_bs4(html_text)
+
+    quests: List[Dict[str, str]] = []
+    seen_hrefs = set()
+
+    for trader, links in rows:
+        for title, href in links:
+            if "/wiki/" not in href:
+                continue
+
+            full_url = urljoin(base_url, href)
+            if full_url in seen_hrefs:
+                continue
+
+            seen_hrefs.add(full_url)
+            quests.append(
+                {
+                    "title": title,
+                    "href": full_url,
+                    "trader": trader,
+                }
+            )
+
+    return quests
+
+
+def iter_navbox_rows_bs4(html_text: str) -> Iterator[Tuple[Optional[str], List[Tuple[str, str]]]]:
+    """
+    Yield (trader, [(link title, href), ...]) for every navbox row.
+    """
     soup = BeautifulSoup(html_text, "html.parser")
 
     navbox = soup.select_one(NAVBOX_SELECTOR)
     if navbox is None:
         raise RuntimeError(f"Navbox ({NAVBOX_SELECTOR}) not found in page source")
 
-    quests: List[Dict[str, str]] = []
-    seen_hrefs = set()
-
     for row in navbox.select("tr"):
         trader_cell = row.select_one("td.va-navbox-group")
         trader = trader_cell.get_text(strip=True) if trader_cell else None
+        links = [
+            (link.get_text(" ", strip=True), link["href"])
+            for quests_cell in row.select("td.va-navbox-cell")
+            for link in quests_cell.find_all("a", href=True)
+        ]
+        yield trader, links
 
-        for quests_cell in row.select("td.va-navbox-cell"):
-            for link in quests_cell.find_all("a", href=True):
-                href = link["href"]
-                if "/wiki/" not in href:
-                    continue
-
-                full_url = urljoin(base_url, href)
-                if full_url in seen_hrefs:
-                    continue
-
-                seen_hrefs.add(full_url)
-                quests.append(
-                    {
-                        "title": link.get_text(" ", strip=True),
-                        "href": full_url,
-                        "trader": trader,
-                    }
-                )
 
-    return quests
+def iter_navbox_rows_lxml(html_text: str) -> Iterator[Tuple[Optional[str], List[Tuple[str, str]]]]:
+    """
+    lxml port of iter_navbox_rows_bs4 (NAVBOX_SELECTOR translated to XPath).
+    """
+    if lxml_html is None:
+        raise RuntimeError("The lxml parser backend needs the lxml package (pip install lxml)")
+    root = lxml_html.document_fromstring(html_text)
+
+    tag, *classes = NAVBOX_SELECTOR.split(".")
+    found = root.xpath(f"//{tag}[{' and '.join(xpath_has_class(c) for c in classes)}]")
+    if not found:
+        raise RuntimeError(f"Navbox ({NAVBOX_SELECTOR}) not found in page source")
+
+    for row in found[0].xpath(".//tr"):
+        trader_cell = row.xpath(f"(.//td[{xpath_has_class('va-navbox-group')}])[1]")
+        trader = lxml_text(trader_cell[0], separator="") if trader_cell else None
+        links = [
+            (lxml_text(link), link.get("href"))
+            for link in row.xpath(f".//td[{xpath_has_class('va-navbox-cell')}]//a[@href]")
+        ]
+        yield trader, links
 
 
 def main() -> None:
@@ -72,14 +114,32 @@ def main() -> None:
         default=DEFAULT_BASE_URL,
         help="Base URL used to resolve relative wiki links.",
     )
+    parser.add_argument(
+        "--parser",
+        default=DEFAULT_PARSER,
+        choices=sorted(PARSERS),
+        help="HTML parser backend (lxml is several times faster and produces the same output)",
+    )
+    parser.add_argument(
+        "--source",
+        default="html",
+        choices=["html", "api"],
+        help="Fetch the full page, or only its rendered article body through api.php (action=parse)",
+    )
+    parser.add_argument("--api-url", default=wiki_api.DEFAULT_API_URL, help="api.php endpoint for --source api")
+    parser.add_argument("--api-fixtures", type=Path, default=None, help="Replay/record api.php responses here")
+    parser.add_argument("--record-fixtures", action="store_true", help="Save live api.php responses to --api-fixtures")
     args = parser.parse_args()
 
     if args.html:
         html_text = args.html.read_text(encoding="utf-8")
+    elif args.source == "api":
+        client = wiki_api.ApiClient(args.api_url, fixtures=args.api_fixtures, record=args.record_fixtures)
+        html_text = wiki_api.fetch_rendered_html(client, wiki_api.title_from_href(args.url))
     else:
         html_text = fetch_html(args.url)
 
-    quests = extract_quest_links(html_text, base_url=args.base_url)
+    quests = extract_quest_links(html_text, base_url=args.base_url, parser=args.parser)
     args.out.write_text(json.dumps(quests, indent=2, ensure_ascii=False), encoding="utf-8")
     print(f"Wrote {len(quests)} quest links to {args.out}")
 
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
 import json
-from dataclasses import dataclass, asdict
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import wiki_api
+import wiki_http
+from quest_parsers import (  # noqa: F401 - re-exported for callers of the old scraper helpers
+    DEFAULT_PARSER,
+    PARSERS,
+    extract_infobox_value,
+    extract_related,
+    extract_section_lines,
+    get_infobox,
+    parse_page,
+    slice_article,
+)
 
 USER_AGENT = "quest-scraper/1.0 (+https://github.com/)"  # polite UA
 DEFAULT_INPUT = "src/quest_links.json"
 DEFAULT_OUTPUT = "src/quests.csv"
+DEFAULT_CACHE_DIR = ".cache/wiki"
+DEFAULT_WORKERS = 1
+DEFAULT_PER_HOST = 4
+REPORT_NAMES = 10  # quest names listed per added/changed/removed line
 
 
 @dataclass
@@ -35,124 +54,390 @@ class Quest:
         return data
 
 
+QUEST_COLUMNS = [f.name for f in fields(Quest)]
+
+
 def fetch_html(url: str) -> str:
-    resp = requests.get(url, headers={"User-Agent": USER_AGENT})
-    resp.raise_for_status()
-    return resp.text
-
-
-def get_infobox(soup: BeautifulSoup):
-    return soup.find("table", class_="va-infobox")
-
-
-def extract_infobox_value(soup: BeautifulSoup, label: str) -> Optional[str]:
-    infobox = get_infobox(soup)
-    if not infobox:
-        return None
-    for cell in infobox.find_all("td", class_="va-infobox-label"):
-        if cell.get_text(" ", strip=True).lower().startswith(label.lower()):
-            content = cell.find_next("td", class_="va-infobox-content")
-            if content:
-                return content.get_text(" ", strip=True)
-    return None
-
-
-def extract_related(soup: BeautifulSoup):
-    """
-    Extract 'Previous' and 'Leads to' lists from the infobox related section.
-    """
-    previous, leads_to = [], []
-    infobox = get_infobox(soup)
-    if not infobox:
-        return previous, leads_to
-
-    for cell in infobox.select("td.va-infobox-content"):
-        text = cell.get_text(" ", strip=True).lower()
-        links = [a.get_text(" ", strip=True) for a in cell.select("a[href]")]
-        if text.startswith("previous:"):
-            previous.extend(links)
-        elif text.startswith("leads to:"):
-            leads_to.extend(links)
-    return previous, leads_to
-
-
-def extract_section_lines(soup: BeautifulSoup, section_id: str) -> List[str]:
-    """
-    Return a list of text lines that belong to a section (Objectives, Dialogue, Rewards, etc.).
-    Stops when the next heading of the same level begins.
-    """
-    headline = soup.find(id=section_id)
-    if not headline:
-        return []
-
-    heading = headline.find_parent(["h2", "h3", "h4"])
-    if not heading:
-        return []
-
-    lines: List[str] = []
-    for sib in heading.next_siblings:
-        if getattr(sib, "name", None) in ["h2", "h3", "h4"]:
-            break
-        if getattr(sib, "name", None) == "ul":
-            for li in sib.find_all("li", recursive=False):
-                text = li.get_text(" ", strip=True)
-                if text:
-                    lines.append(text)
-        elif getattr(sib, "name", None) == "p":
-            text = sib.get_text(" ", strip=True)
-            if text:
-                lines.append(text)
-    return lines
-
-
-def scrape_quest(url: str) -> Quest:
-    html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
-
-    name = soup.find("h1", id="firstHeading")
-    quest_name = name.get_text(" ", strip=True) if name else url
-
-    given_by = extract_infobox_value(soup, "Given by")
-    location = extract_infobox_value(soup, "Location")
-    previous, leads_to = extract_related(soup)
-    dialogue = extract_section_lines(soup, "Dialogue")
-    requirements = extract_section_lines(soup, "Requirements")
-    objectives = extract_section_lines(soup, "Objectives")
-    rewards = extract_section_lines(soup, "Rewards")
+    return wiki_http.fetch_html(url, USER_AGENT)
+
+
+class HostLimiter:
+    """
+    Cap the number of in-flight requests per host across worker threads.
+    """
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    def slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
+
+
+def rebase_url(url: str, base_url: Optional[str]) -> str:
+    """
+    Point a wiki URL at another host (e.g. a local stand-in serving saved pages), keeping the path.
+    """
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip("/") + parts.path, parts.query, parts.fragment))
+
+
+def article_html(html: str, full_page: bool = False) -> str:
+    """
+    The part of a quest page worth parsing: heading plus article body, or the whole page if it can't be sliced.
+    """
+    if full_page:
+        return html
+    return slice_article(html) or html
+
+
+def parse_quest(html: str, href: str, parser: str = DEFAULT_PARSER, full_page: bool = False) -> Quest:
+    """
+    Quest fields from a page. `href` is the quest's wiki link (not a --base-url rebased one), used as the
+    name when the page has no heading.
+    """
+    record = parse_page(article_html(html, full_page), parser).extract()
 
     return Quest(
-        name=quest_name,
-        location=location,
-        given_by=given_by,
-        dialogue=dialogue,
-        requirements=requirements,
-        objectives=objectives,
-        rewards=rewards,
-        previous=previous,
-        leads_to=leads_to,
+        name=record.heading if record.heading is not None else href,
+        location=record.infobox_value("Location"),
+        given_by=record.infobox_value("Given by"),
+        dialogue=record.sections["Dialogue"],
+        requirements=record.sections["Requirements"],
+        objectives=record.sections["Objectives"],
+        rewards=record.sections["Rewards"],
+        previous=record.previous,
+        leads_to=record.leads_to,
     )
 
 
-def main() -> None:
+@dataclass
+class ScrapeResult:
+    href: str
+    quest: Quest
+    digest: str
+    status: str  # "added", "changed" or "unchanged" relative to the previous state
+
+
+def content_digest(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+
+def state_path(out_path: Path) -> Path:
+    return Path(out_path).with_suffix(".hashes.json")
+
+
+def load_state(path: Path) -> Dict[str, dict]:
+    """
+    Read the per-href content hashes and parsed quests written by a previous run.
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("quests", {}) if isinstance(data, dict) else {}
+
+
+def save_state(path: Path, results: List[ScrapeResult], stored: Dict[str, dict], hrefs: set) -> None:
+    """
+    Write the hashes of this run's results on top of the `stored` entries that are still in `hrefs` (the
+    full link set), so a --limit or --resume run doesn't drop the quests it didn't scrape.
+    """
+    quests = {href: entry for href, entry in stored.items() if href in hrefs}
+    quests.update({r.href: {"sha1": r.digest, "quest": asdict(r.quest)} for r in results})
+    Path(path).write_text(json.dumps({"version": 1, "quests": quests}, ensure_ascii=False), encoding="utf-8")
+
+
+def scrape_quest(
+    url: str,
+    limiter: Optional[HostLimiter] = None,
+    parser: str = DEFAULT_PARSER,
+    full_page: bool = False,
+) -> Quest:
+    return parse_quest(fetch_quest_html(url, limiter), url, parser, full_page)
+
+
+def fetch_quest_html(url: str, limiter: Optional[HostLimiter] = None) -> str:
+    if limiter is None:
+        return fetch_html(url)
+    with limiter.slot(url):
+        return fetch_html(url)
+
+
+def scrape_quests(quest_links: List[dict], **options) -> List[ScrapeResult]:
+    return list(iter_scrape_quests(quest_links, **options))
+
+
+def iter_scrape_quests(
+    quest_links: List[dict],
+    workers: int = DEFAULT_WORKERS,
+    per_host: int = DEFAULT_PER_HOST,
+    base_url: Optional[str] = None,
+    previous: Optional[Dict[str, dict]] = None,
+    parser: str = DEFAULT_PARSER,
+    full_page: bool = False,
+) -> Iterator[ScrapeResult]:
+    """
+    Scrape every quest link, fetching up to `workers` pages at once (at most `per_host` per host).
+    Results are yielded in input order regardless of completion order.
+    Pages whose article hash matches `previous` (see load_state) reuse the stored quest instead of being parsed.
+    """
+    total = len(quest_links)
+    limiter = HostLimiter(per_host)
+    previous = previous or {}
+
+    def run(item):
+        idx, q = item
+        url = rebase_url(q["href"], base_url)
+        # Hash only the article so nav/ad churn around it doesn't count as a change.
+        article = article_html(fetch_quest_html(url, limiter), full_page)
+        digest = content_digest(article)
+        known = previous.get(q["href"])
+        if known and known.get("sha1") == digest:
+            return ScrapeResult(q["href"], Quest(**known["quest"]), digest, "unchanged")
+        status = "changed" if known else "added"
+        return ScrapeResult(q["href"], parse_quest(article, q["href"], parser, full_page=True), digest, status)
+
+    def in_order(results):
+        # Progress is printed here, on the consuming side, so lines stay ordered with several workers.
+        for (idx, q), result in zip(jobs, results):
+            print(f"[{idx}/{total}] Scraped {q['title']}")
+            yield result
+
+    jobs = list(enumerate(quest_links, start=1))
+    if workers <= 1:
+        yield from in_order(map(run, jobs))
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from in_order(pool.map(run, jobs))
+
+
+def scrape_quests_api(
+    quest_links: List[dict],
+    client: wiki_api.ApiClient,
+    previous: Optional[Dict[str, dict]] = None,
+) -> Iterator[ScrapeResult]:
+    """
+    Build the same Quest rows from page wikitext fetched through api.php, 50 pages per request.
+    Rows are yielded as each batch arrives, so the journal keeps them if a later request fails; pages the
+    API has no wikitext for are skipped with a warning and left for the next --resume.
+    """
+    previous = previous or {}
+    by_title: Dict[str, List[dict]] = {}
+    for q in quest_links:
+        by_title.setdefault(wiki_api.title_from_href(q["href"]), []).append(q)
+    titles = list(by_title)
+    print(f"Fetching wikitext for {len(titles)} quests in {-(-len(titles) // wiki_api.MAX_TITLES)} API requests...")
+
+    for pages in wiki_api.iter_wikitext(client, titles):
+        for title, (resolved, wikitext) in pages.items():
+            for q in by_title[title]:
+                if wikitext is None:
+                    print(f"Skipping {q['title']}: no wikitext returned for {title!r} ({q['href']})")
+                    continue
+                digest = content_digest(wikitext)
+                known = previous.get(q["href"])
+                if known and known.get("sha1") == digest:
+                    yield ScrapeResult(q["href"], Quest(**known["quest"]), digest, "unchanged")
+                    continue
+                status = "changed" if known else "added"
+                yield ScrapeResult(q["href"], Quest(**wiki_api.quest_fields(resolved, wikitext)), digest, status)
+
+
+class QuestCsvWriter:
+    """
+    Stream quest rows to `<out>.partial` (same format as DataFrame.to_csv) and move it over `out` on success.
+    Each row is also appended to `<out>.journal.jsonl`, so an interrupted run can be picked up with resume=True.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + ".partial")
+        self.journal_path = self.path.with_name(self.path.name + ".journal.jsonl")
+        self.results: List[ScrapeResult] = self.load_journal() if resume else []
+        self._file = None
+        self._writer = None
+        self._journal = None
+
+    @property
+    def count(self) -> int:
+        return len(self.results)
+
+    def done_hrefs(self) -> set:
+        return {r.href for r in self.results}
+
+    def load_journal(self) -> List[ScrapeResult]:
+        results = []
+        try:
+            lines = self.journal_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            if self.partial_path.exists():
+                print(
+                    f"Warning: {self.partial_path} has no {self.journal_path.name} next to it, so there is nothing to "
+                    "resume from; scraping every quest again"
+                )
+            return results
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn last line from an interrupted write
+            results.append(ScrapeResult(entry["href"], Quest(**entry["quest"]), entry["sha1"], entry["status"]))
+        return results
+
+    def __enter__(self) -> "QuestCsvWriter":
+        self._file = open(self.partial_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=QUEST_COLUMNS, lineterminator=os.linesep)
+        self._writer.writeheader()
+        for result in self.results:
+            self._writer.writerow(result.quest.as_row())
+        self._file.flush()
+        # Rewrite the journal so a torn tail from the previous run doesn't linger.
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        for result in self.results:
+            self._append_journal(result)
+        self._journal.flush()
+        return self
+
+    def _append_journal(self, result: ScrapeResult) -> None:
+        entry = {"href": result.href, "sha1": result.digest, "status": result.status, "quest": asdict(result.quest)}
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def write(self, result: ScrapeResult) -> None:
+        self._writer.writerow(result.quest.as_row())
+        self._file.flush()
+        self._append_journal(result)
+        self._journal.flush()
+        self.results.append(result)
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self._file.close()
+        self._journal.close()
+        if exc_type is None:
+            os.replace(self.partial_path, self.path)
+            self.journal_path.unlink()
+
+
+def report_changes(previous: Dict[str, dict], hrefs: set, results: List[ScrapeResult]) -> None:
+    removed = [entry["quest"]["name"] for href, entry in previous.items() if href not in hrefs]
+    for label, names in [
+        ("Added", [r.quest.name for r in results if r.status == "added"]),
+        ("Changed", [r.quest.name for r in results if r.status == "changed"]),
+        ("Removed", removed),
+    ]:
+        shown = ", ".join(names[:REPORT_NAMES]) + (f", +{len(names) - REPORT_NAMES} more" if len(names) > REPORT_NAMES else "")
+        print(f"{label}: {len(names)}" + (f" ({shown})" if names else ""))
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Scrape quest details from Tarkov wiki pages.")
     parser.add_argument("--links", default=DEFAULT_INPUT, type=Path, help="Path to quest_links.json")
     parser.add_argument("--out", default=DEFAULT_OUTPUT, type=Path, help="Where to write the CSV")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of quests for quick testing")
-    args = parser.parse_args()
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of pages to fetch concurrently")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent requests per host")
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Fetch quest pages from this host instead (e.g. a local server with saved pages for benchmarking).",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="Read timeout in seconds per request")
+    parser.add_argument("--retries", type=int, default=None, help="Retries on 429/5xx and connection errors")
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        type=Path,
+        help="Conditional-GET cache for quest pages (ETag/Last-Modified)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always download pages in full")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-parse pages whose content hash changed since the last run (hashes kept next to --out)",
+    )
+    parser.add_argument(
+        "--parser",
+        default=DEFAULT_PARSER,
+        choices=sorted(PARSERS),
+        help="HTML parser backend (lxml is several times faster and produces the same CSV)",
+    )
+    parser.add_argument(
+        "--full-page",
+        action="store_true",
+        help="Parse the whole page instead of slicing out the heading and article body first",
+    )
+    parser.add_argument(
+        "--source",
+        default="html",
+        choices=["html", "api"],
+        help="Scrape rendered pages, or fetch wikitext in batches through api.php",
+    )
+    parser.add_argument("--api-url", default=wiki_api.DEFAULT_API_URL, help="api.php endpoint for --source api")
+    parser.add_argument(
+        "--api-fixtures",
+        type=Path,
+        default=None,
+        help="Replay api.php responses from this directory (or save them there with --record-fixtures)",
+    )
+    parser.add_argument("--record-fixtures", action="store_true", help="Save live api.php responses to --api-fixtures")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep the rows an interrupted run journaled to <out>.journal.jsonl and only scrape the quests it is missing",
+    )
+    return parser
+
+
+def main() -> None:
+    args = build_arg_parser().parse_args()
+
+    # One keep-alive connection per allowed in-flight request to the wiki host.
+    wiki_http.configure(pool_maxsize=max(1, args.per_host), read_timeout=args.timeout, retries=args.retries)
+    cache = wiki_http.set_cache_dir(None if args.no_cache else args.cache_dir)
 
     quest_links = json.loads(Path(args.links).read_text(encoding="utf-8"))
+    all_hrefs = {q["href"] for q in quest_links}
     if args.limit:
         quest_links = quest_links[: args.limit]
 
-    rows = []
-    for idx, q in enumerate(quest_links, start=1):
-        print(f"[{idx}/{len(quest_links)}] Scraping {q['title']}...")
-        quest = scrape_quest(q["href"])
-        rows.append(quest.as_row())
+    hashes_path = state_path(args.out)
+    stored = load_state(hashes_path)
+    previous = stored if args.incremental else {}
+    with QuestCsvWriter(args.out, resume=args.resume) as writer:
+        done = writer.done_hrefs()
+        if done:
+            print(f"Resuming: {len(done)} quests already in {writer.partial_path}")
+        todo = [q for q in quest_links if q["href"] not in done]
+        if args.source == "api":
+            client = wiki_api.ApiClient(args.api_url, fixtures=args.api_fixtures, record=args.record_fixtures)
+            results = scrape_quests_api(todo, client, previous=previous) if todo else []
+        else:
+            results = iter_scrape_quests(
+                todo,
+                workers=args.workers,
+                per_host=args.per_host,
+                base_url=args.base_url,
+                previous=previous,
+                parser=args.parser,
+                full_page=args.full_page,
+            )
+        for result in results:
+            writer.write(result)
 
-    df = pd.DataFrame(rows)
-    df.to_csv(args.out, index=False, encoding="utf-8")
-    print(f"Wrote {len(df)} quests to {args.out}")
+    save_state(hashes_path, writer.results, stored, all_hrefs)
+    print(f"Wrote {writer.count} quests to {args.out}")
+    if args.incremental:
+        report_changes(previous, all_hrefs, writer.results)
+    if cache and args.source == "html":
+        print(f"HTTP cache: {cache.revalidated} unchanged (304), {cache.downloaded} downloaded")
 
 
 if __name__ == "__main__":
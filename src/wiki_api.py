@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import wiki_http
+from quest_parsers import SECTION_IDS
+
+# MediaWiki api.php access: batched wikitext for quest pages, rendered HTML for the quest list.
+DEFAULT_API_URL = "https://escapefromtarkov.fandom.com/api.php"
+USER_AGENT = "quest-api-client/1.0 (+https://github.com/)"
+MAX_TITLES = 50  # api.php limit for titles= per query without apihighlimits
+INFOBOX_RE = re.compile(r"\{\{\s*(?:infobox[ _]quest|quest[ _]infobox)\b", re.IGNORECASE)
+HEADING_RE = re.compile(r"^(={2,4})\s*(.+?)\s*\1\s*$")
+# [[target|label]]trail: letters right after the link ("[[Scav]]s") render inside it.
+LINK_RE = re.compile(r"\[\[([^\[\]|]*)(?:\|([^\[\]]*))?\]\]([a-z]*)")
+EXTERNAL_LINK_RE = re.compile(r"\[(?:https?:)?//[^\s\]]+(?:\s+([^\]]*))?\]")
+# Boundaries where the rendered page starts a new text node (links, tags, bold/italic runs).
+NODE_BREAK_RE = re.compile(r"'{2,}|<[^>]+>|\x00")
+REF_RE = re.compile(r"<ref\b[^>/]*/>|<ref\b.*?</ref\s*>", re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+# List markers; extract_section_lines only reads <ul> (*), never <ol> (#) or <dl> (; and :).
+LIST_MARKERS = "*#;:"
+
+logger = logging.getLogger(__name__)
+
+
+class ApiClient:
+    """
+    Thin api.php client. With `fixtures` set, responses are replayed from (or, with record=True, saved to)
+    JSON files keyed by the request parameters, so the API backend can run offline.
+    """
+
+    def __init__(self, api_url: str = DEFAULT_API_URL, fixtures: Optional[Path] = None, record: bool = False):
+        self.api_url = api_url
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.record = record
+        self.requests = 0
+
+    def fixture_path(self, params: dict) -> Path:
+        key = json.dumps(sorted(params.items()), ensure_ascii=False)
+        return self.fixtures / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, **params) -> dict:
+        params = {"format": "json", "formatversion": "2", **params}
+        if self.fixtures and not self.record:
+            return json.loads(self.fixture_path(params).read_text(encoding="utf-8"))
+        self.requests += 1
+        data = wiki_http.fetch_json(self.api_url, params, USER_AGENT)
+        if "error" in data:
+            raise RuntimeError(f"api.php error: {data['error'].get('info', data['error'])}")
+        if self.fixtures:
+            self.fixtures.mkdir(parents=True, exist_ok=True)
+            self.fixture_path(params).write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        return data
+
+
+def title_from_href(href: str) -> str:
+    """
+    Page title for a /wiki/ URL, e.g. .../wiki/Background_Check -> "Background Check".
+    """
+    path = urlsplit(href).path
+    return unquote(path.split("/wiki/", 1)[-1]).replace("_", " ")
+
+
+def batched(items: List[str], size: int = MAX_TITLES) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def fetch_wikitext(client: ApiClient, titles: List[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Map each requested title to (resolved page title, wikitext or None if missing), 50 titles per request.
+    """
+    results: Dict[str, Tuple[str, Optional[str]]] = {}
+    for pages in iter_wikitext(client, titles):
+        results.update(pages)
+    return results
+
+
+def iter_wikitext(client: ApiClient, titles: List[str]) -> Iterator[Dict[str, Tuple[str, Optional[str]]]]:
+    """
+    Like fetch_wikitext, but yield each batch's titles as soon as its request returns.
+    """
+    for batch in batched(titles):
+        results: Dict[str, Tuple[str, Optional[str]]] = {}
+        data = client.get(
+            action="query",
+            prop="revisions",
+            rvprop="content",
+            rvslots="main",
+            redirects="1",
+            titles="|".join(batch),
+        )
+        query = data.get("query", {})
+        # Follow normalisation (underscores, case) and redirects back to the requested title.
+        renamed = {}
+        for step in query.get("normalized", []) + query.get("redirects", []):
+            renamed[step["from"]] = step["to"]
+        pages = {page["title"]: page for page in query.get("pages", [])}
+        for title in batch:
+            resolved = title
+            seen = set()
+            while resolved in renamed and resolved not in seen:
+                seen.add(resolved)
+                resolved = renamed[resolved]
+            page = pages.get(resolved, {})
+            revisions = page.get("revisions") or []
+            content = revisions[0]["slots"]["main"].get("content") if revisions else None
+            results[title] = (resolved, content)
+        yield results
+
+
+def fetch_rendered_html(client: ApiClient, page: str) -> str:
+    """
+    Rendered article HTML for one page (action=parse), without the skin, nav and ads around it.
+    """
+    data = client.get(action="parse", page=page, prop="text", redirects="1")
+    return data["parse"]["text"]
+
+
+def split_top_level(text: str, sep: str = "|") -> List[str]:
+    """
+    Split template arguments on `sep`, ignoring separators nested in {{...}} or [[...]].
+    """
+    parts, depth, start, idx = [], 0, 0, 0
+    while idx < len(text):
+        pair = text[idx : idx + 2]
+        if pair in ("{{", "[["):
+            depth += 1
+            idx += 2
+            continue
+        if pair in ("}}", "]]"):
+            depth = max(0, depth - 1)
+            idx += 2
+            continue
+        if text[idx] == sep and depth == 0:
+            parts.append(text[start:idx])
+            start = idx + 1
+        idx += 1
+    parts.append(text[start:])
+    return parts
+
+
+def template_body(wikitext: str, start: int) -> Optional[str]:
+    """
+    Inner text of the template opening at `start` ("{{"), up to its matching "}}".
+    """
+    depth, idx = 0, start
+    while idx < len(wikitext):
+        pair = wikitext[idx : idx + 2]
+        if pair == "{{":
+            depth += 1
+            idx += 2
+        elif pair == "}}":
+            depth -= 1
+            idx += 2
+            if depth == 0:
+                return wikitext[start + 2 : idx - 2]
+        else:
+            idx += 1
+    return None
+
+
+def strip_templates(text: str, dropped: Optional[List[str]] = None) -> str:
+    """
+    Remove every {{...}} template, appending the names of the outermost ones to `dropped`. A space left
+    on both sides of a removed template is kept once.
+    """
+    out, depth, idx, start = [], 0, 0, 0
+    while idx < len(text):
+        pair = text[idx : idx + 2]
+        if pair == "{{":
+            if not depth:
+                start = idx
+            depth += 1
+            idx += 2
+        elif pair == "}}" and depth:
+            depth -= 1
+            idx += 2
+            if not depth:
+                if dropped is not None:
+                    dropped.append(text[start + 2 : idx - 2].split("|", 1)[0].strip())
+                if out and out[-1] in " \t":
+                    while idx < len(text) and text[idx] in " \t":
+                        idx += 1
+        else:
+            if not depth:
+                out.append(text[idx])
+            idx += 1
+    return "".join(out)
+
+
+def infobox_params(wikitext: str) -> Dict[str, str]:
+    match = INFOBOX_RE.search(wikitext)
+    if not match:
+        return {}
+    body = template_body(wikitext, match.start())
+    if body is None:
+        return {}
+    params = {}
+    for part in split_top_level(body)[1:]:
+        key, eq, value = part.partition("=")
+        if eq:
+            params[key.strip().lower().replace("_", " ")] = value.strip()
+    return params
+
+
+def clean_markup(text: str, dropped: Optional[List[str]] = None) -> str:
+    text = COMMENT_RE.sub("", text)
+    text = REF_RE.sub("", text)
+    return strip_templates(text, dropped)
+
+
+def link_texts(text: str) -> List[str]:
+    """
+    Display text of every internal link, like the a[href] texts of the rendered infobox.
+    """
+    names = []
+    for match in LINK_RE.finditer(clean_markup(text)):
+        if is_media_link(match):
+            continue
+        name = plain_text(link_label(match))
+        if name:
+            names.append(name)
+    return names
+
+
+def is_media_link(match: re.Match) -> bool:
+    # Images and category tags: no link text on the rendered page.
+    return match.group(1).strip().lower().startswith(("file:", "image:", "category:"))
+
+
+def link_label(match: re.Match) -> str:
+    if is_media_link(match):
+        return ""
+    return (match.group(2) if match.group(2) is not None else match.group(1)) + match.group(3)
+
+
+def plain_text(text: str, dropped: Optional[List[str]] = None) -> str:
+    """
+    Approximate BeautifulSoup's get_text(" ", strip=True) on the rendered markup: every link, tag and
+    bold/italic run starts a new text node, nodes are stripped and joined with single spaces. Templates
+    are dropped (their names go to `dropped`).
+    """
+    text = clean_markup(text, dropped)
+    text = LINK_RE.sub(lambda m: "\x00" + link_label(m) + "\x00", text)
+    text = EXTERNAL_LINK_RE.sub(lambda m: "\x00" + (m.group(1) or "") + "\x00", text)
+    text = BR_RE.sub("\x00", text)
+    nodes = (node.strip() for node in NODE_BREAK_RE.split(text))
+    return " ".join(node for node in nodes if node)
+
+
+def section_lines(wikitext: str, section_id: str, dropped: Optional[List[str]] = None) -> List[str]:
+    """
+    Lines of a == Section ==, mirroring extract_section_lines: top-level * items (with their nested
+    items folded in) and paragraphs, up to the next level 2-4 heading. # and ;/: lists are skipped like
+    the <ol> and <dl> they render to. Names of templates dropped from the lines go to `dropped`.
+    """
+    lines: List[str] = []
+    current: Optional[List[str]] = None
+    paragraph: List[str] = []
+    inside = False
+
+    def flush_paragraph():
+        text = plain_text(" ".join(paragraph), dropped)
+        if text:
+            lines.append(text)
+        paragraph.clear()
+
+    def flush_item():
+        nonlocal current
+        if current is not None:
+            text = plain_text(" \x00".join(current), dropped)
+            if text:
+                lines.append(text)
+        current = None
+
+    for raw in wikitext.splitlines():
+        heading = HEADING_RE.match(raw.strip())
+        if heading:
+            if inside:
+                break
+            inside = plain_text(heading.group(2)).replace(" ", "_") == section_id
+            continue
+        if not inside:
+            continue
+        line = raw.rstrip()
+        if line.startswith(tuple(LIST_MARKERS)):
+            flush_paragraph()
+            marker = len(line) - len(line.lstrip(LIST_MARKERS))
+            if line[0] != "*":
+                flush_item()
+            elif marker == 1:
+                flush_item()
+                current = [line[1:]]
+            elif current is not None:
+                current.append(line[marker:])
+        elif not line.strip():
+            flush_item()
+            flush_paragraph()
+        else:
+            flush_item()
+            paragraph.append(line)
+    flush_item()
+    flush_paragraph()
+    return lines
+
+
+def quest_fields(title: str, wikitext: str) -> dict:
+    """
+    Keyword arguments for scraper.Quest built from a quest page's wikitext.
+    """
+    params = infobox_params(wikitext)
+    # The infobox hides rows whose value is empty, so those read as missing on the rendered page too.
+    given_by = plain_text(params.get("given by", "")) or None
+    location = plain_text(params.get("location", "")) or None
+    fields = {
+        "name": title,
+        "location": location,
+        "given_by": given_by,
+        "previous": link_texts(params.get("previous", "")),
+        "leads_to": link_texts(params.get("leads to", "")),
+    }
+    for section_id in SECTION_IDS:
+        dropped: List[str] = []
+        fields[section_id.lower()] = section_lines(wikitext, section_id, dropped)
+        if dropped:
+            # The rendered page shows whatever these expand to; the row doesn't.
+            names = ", ".join(dict.fromkeys(dropped))
+            logger.warning("%s: dropped templates in %s (%s); the row lacks any text they render", title, section_id, names)
+    return fields
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP layer for every wiki fetch (quest list and quest pages).
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class SessionSettings:
+    pool_connections: int = 4  # distinct hosts kept in the pool
+    pool_maxsize: int = 8  # keep-alive connections per host
+    retries: int = 3
+    backoff: float = 0.5  # sleeps 0.5s, 1s, 2s, ... between retries
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+class ResponseCache:
+    """
+    On-disk store of response bodies plus their ETag/Last-Modified validators, keyed by URL.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.revalidated = 0
+        self.downloaded = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.html", self.root / f"{key}.json"
+
+    def load(self, url: str) -> Optional[Tuple[str, dict]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("sha1") != _digest(body):
+            return None
+        return body, meta
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "sha1": _digest(body)}
+        # The body hash in meta turns a half-written entry into a cache miss.
+        _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
+
+    def count(self, revalidated: bool) -> None:
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.downloaded += 1
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+_settings = SessionSettings()
+_sessions: Dict[str, requests.Session] = {}
+_cache: Optional[ResponseCache] = None
+_lock = threading.Lock()
+
+
+def configure(**overrides) -> SessionSettings:
+    """
+    Update pool/retry/timeout settings. Open sessions are closed so the next fetch picks them up.
+    """
+    global _settings
+    with _lock:
+        _settings = replace(_settings, **{k: v for k, v in overrides.items() if v is not None})
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        return _settings
+
+
+def current_settings() -> SessionSettings:
+    return _settings
+
+
+def current_cache() -> Optional[ResponseCache]:
+    return _cache
+
+
+def set_cache_dir(cache_dir: Optional[Path]) -> Optional[ResponseCache]:
+    """
+    Enable the conditional-GET response cache under `cache_dir`, or disable it with None.
+    """
+    global _cache
+    _cache = ResponseCache(cache_dir) if cache_dir else None
+    return _cache
+
+
+def build_session(user_agent: str, settings: SessionSettings) -> requests.Session:
+    retry = Retry(
+        total=settings.retries,
+        backoff_factor=settings.backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.pool_connections,
+        pool_maxsize=settings.pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers["User-Agent"] = user_agent
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(user_agent: str) -> requests.Session:
+    """
+    Return the shared keep-alive session for a user agent, creating it on first use.
+    """
+    with _lock:
+        session = _sessions.get(user_agent)
+        if session is None:
+            session = _sessions[user_agent] = build_session(user_agent, _settings)
+        return session
+
+
+def fetch_html(url: str, user_agent: str) -> str:
+    cache = _cache
+    cached = cache.load(url) if cache else None
+    headers = {}
+    if cached:
+        _, meta = cached
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = get_session(user_agent).get(url, headers=headers, timeout=_settings.timeout)
+    if cached and resp.status_code == 304:
+        cache.count(revalidated=True)
+        return cached[0]
+    resp.raise_for_status()
+    if cache:
+        cache.count(revalidated=False)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.store(url, resp.text, etag, last_modified)
+    return resp.text
+
+
+def fetch_json(url: str, params: dict, user_agent: str) -> dict:
+    resp = get_session(user_agent).get(url, params=params, timeout=_settings.timeout)
+    resp.raise_for_status()
+    return resp.json()